@@ -1,10 +1,20 @@
 # config/etl_settings.py
+import atexit
+import gzip
+import json
 import os
 import sqlite3
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent.absolute()
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
@@ -15,38 +25,274 @@ LOG_DIR = os.path.join(PROJECT_ROOT, "logs")
 # Database settings
 DATABASE_PATH = os.path.join(PROCESSED_DIR, "nba_data.db")
 
+# Connection PRAGMAs: WAL + NORMAL sync avoids the rollback-journal fsyncs on every commit.
+# Foreign keys stay unenforced: loaders may write fact rows before their dimension rows.
+# busy_timeout lets a writer wait out a reader's checkpoint instead of failing with "database is locked".
+DB_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-65536;
+PRAGMA mmap_size=268435456;
+PRAGMA busy_timeout=5000;
+PRAGMA wal_autocheckpoint=1000;
+PRAGMA foreign_keys=OFF;
+"""
+
+# Secondary indexes behind the ETL lookups; every table's natural key is already its PRIMARY KEY
+DB_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_pgs_game_id ON fact_player_game_stats(game_id)",
+    "CREATE INDEX IF NOT EXISTS ix_dim_games_game_date ON dim_games(game_date)",
+]
+
 # Ensure directories exist
 os.makedirs(RAW_DIR, exist_ok=True)
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 os.makedirs(LOG_DIR, exist_ok=True)
 
+# HTTP response cache for stats.nba.com, keyed by URL pattern (seconds, -1 = never expire)
+HTTP_CACHE_PATH = os.path.join(DATA_DIR, "http_cache")
+HTTP_CACHE_DEFAULT_EXPIRY = 3600
+HTTP_CACHE_EXPIRY = {
+    # Per-game stats of completed games never change; see evict_http_cache for live games
+    '*/boxscoretraditionalv2*': -1,
+    '*/boxscoreadvancedv2*': -1,
+    '*/boxscoreplayertrackv2*': -1,
+    '*/hustlestatsboxscore*': -1,
+    '*/shotchartdetail*': -1,
+    '*/leaguegamefinder*': 3600,
+    '*/commonallplayers*': 86400,
+}
+
+# requests_cache is optional; without it every API call goes to the network
+try:
+    import requests_cache
+    requests_cache.install_cache(
+        HTTP_CACHE_PATH,
+        backend='sqlite',
+        expire_after=HTTP_CACHE_DEFAULT_EXPIRY,
+        urls_expire_after=HTTP_CACHE_EXPIRY
+    )
+except ImportError:
+    requests_cache = None
+
+# Shared keep-alive session for stats.nba.com, sized to the box score worker pool.
+# Created after the cache is installed so its requests go through the cache too.
+NBA_HTTP_POOL_SIZE = 4
+NBA_HTTP_RETRIES = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504)
+)
+
+NBA_SESSION = requests.Session()
+NBA_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=NBA_HTTP_POOL_SIZE,
+    pool_maxsize=NBA_HTTP_POOL_SIZE,
+    max_retries=NBA_HTTP_RETRIES
+))
+
+try:
+    from nba_api.stats.library.http import NBAStatsHTTP
+    NBAStatsHTTP.set_session(NBA_SESSION)
+except (ImportError, AttributeError):
+    # nba_api missing, or too old to accept a shared session
+    pass
+
+def evict_http_cache(url):
+    """Drop url's cached response, e.g. a box score for a game still in progress"""
+    cache = getattr(NBA_SESSION, 'cache', None)
+    if cache is None:
+        return
+    try:
+        cache.delete(urls=[url])
+    except TypeError:
+        # requests_cache < 1.0
+        cache.delete_url(url)
+
+# orjson is optional; the stdlib encoder produces the same compact JSON, only slower
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pyarrow is optional; without it processed rows are not mirrored to Parquet
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Raw API archives are written as gzip-compressed compact JSON on a background thread.
+# Set RAW_KEEP_JSON=0 to rely on the Parquet copies of the transformed rows instead.
+RAW_KEEP_JSON = os.environ.get("RAW_KEEP_JSON", "1") != "0"
+RAW_COMPRESS_LEVEL = 6
+RAW_WRITE_QUEUE_SIZE = 8  # pending writes before write_raw_json blocks the caller
+
+_raw_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="raw_writer")
+_raw_write_slots = threading.BoundedSemaphore(RAW_WRITE_QUEUE_SIZE)
+
+def _write_raw_json(raw_file, data):
+    """Encode data and write it to raw_file"""
+    if orjson is not None:
+        payload = orjson.dumps(data)
+    else:
+        payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    
+    with gzip.open(raw_file, 'wb', compresslevel=RAW_COMPRESS_LEVEL) as f:
+        f.write(payload)
+
+def _write_parquet(path, rows):
+    """Write a list of row dicts to path as a Parquet file"""
+    pq.write_table(pa.Table.from_pylist(rows), path)
+
+def _raw_write_done(future):
+    """Free the queue slot and report a failed write"""
+    _raw_write_slots.release()
+    error = future.exception()
+    if error is not None:
+        get_logger("raw_writer").error(f"Error writing raw data: {error}")
+
+def _submit_write(write, path, data):
+    """Queue a background write, blocking while RAW_WRITE_QUEUE_SIZE writes are pending"""
+    _raw_write_slots.acquire()
+    future = _raw_writer.submit(write, path, data)
+    future.add_done_callback(_raw_write_done)
+    return future
+
+def write_raw_json(raw_file, data):
+    """Queue raw API data to be written to raw_file as gzip-compressed JSON
+    
+    Returns the write's Future, or None when RAW_KEEP_JSON is off; pending
+    writes are flushed at interpreter exit.
+    """
+    if not RAW_KEEP_JSON:
+        return None
+    return _submit_write(_write_raw_json, raw_file, data)
+
+def write_processed_parquet(rows, name):
+    """Queue transformed rows to be written to PROCESSED_DIR as Parquet
+    
+    Returns the file path, or None when pyarrow is not installed or there are no rows.
+    """
+    if pa is None or not rows:
+        return None
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(PROCESSED_DIR, f"{name}_{timestamp}.parquet")
+    _submit_write(_write_parquet, path, rows)
+    return path
+
+# API rate limiting
+class TokenBucket:
+    """Thread-safe token bucket that paces requests to an external API"""
+    
+    def __init__(self, rate, capacity):
+        """rate is tokens refilled per second; capacity is the largest burst allowed"""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping only while the bucket is empty"""
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time.sleep((1 - self.tokens) / self.rate)
+
 # Configure logging
+_logger_lock = threading.Lock()
+
 def get_logger(name):
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
     
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
+    # Handlers are attached once per logger; later calls reuse them
+    with _logger_lock:
+        if logger.handlers:
+            return logger
+        
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        
+        # Console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        
+        # File handler
+        today = datetime.now().strftime("%Y-%m-%d")
+        file_handler = logging.FileHandler(os.path.join(LOG_DIR, f"{name}_{today}.log"))
+        file_handler.setLevel(logging.INFO)
+        
+        # Formatter
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        console_handler.setFormatter(formatter)
+        file_handler.setFormatter(formatter)
+        
+        # Add handlers
+        logger.addHandler(console_handler)
+        logger.addHandler(file_handler)
     
-    # File handler
-    today = datetime.now().strftime("%Y-%m-%d")
-    file_handler = logging.FileHandler(os.path.join(LOG_DIR, f"{name}_{today}.log"))
-    file_handler.setLevel(logging.INFO)
+    return logger
+
+# Database connection
+_indexes_checked_on = None
+_analyzed_on = None
+
+def ensure_indexes(conn):
+    """Create secondary indexes and refresh planner statistics, each once per day
     
-    # Formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
+    Skipped while conn has a transaction open, so a caller's pending writes are
+    never committed from here; the next get_db_connection() call catches up.
+    Outside a transaction each statement below commits on its own.
+    """
+    global _indexes_checked_on, _analyzed_on
+    today = datetime.now().date()
+    if (_indexes_checked_on == today and _analyzed_on == today) or conn.in_transaction:
+        return
     
-    # Add handlers
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    if _indexes_checked_on != today:
+        all_created = True
+        for ddl in DB_INDEXES:
+            try:
+                conn.execute(ddl)
+            except sqlite3.OperationalError:
+                # Table not created yet; the index is retried on the next connection
+                all_created = False
+        if all_created:
+            _indexes_checked_on = today
     
-    return logger
+    # Memoized separately, so a missing table doesn't re-run ANALYZE on every call
+    if _analyzed_on != today:
+        conn.execute("ANALYZE")
+        _analyzed_on = today
+
+# One connection per thread, shared by every ETL phase and closed at exit
+_local = threading.local()
 
-# Database connection
 def get_db_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-    return conn
\ No newline at end of file
+    """Return this thread's shared database connection, opening it on first use"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DATABASE_PATH)
+        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        conn.executescript(DB_PRAGMAS)
+        _local.conn = conn
+    
+    ensure_indexes(conn)
+    return conn
+
+def close_db_connection():
+    """Close this thread's shared database connection, if open"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+atexit.register(close_db_connection)
@@ -1,11 +1,30 @@
 # etl/games_etl.py
-import json
 import os
 from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
 from nba_api.stats.endpoints import leaguegamefinder
 
-from config.etl_settings import get_logger, get_db_connection, RAW_DIR
+from config.etl_settings import get_logger, get_db_connection, write_processed_parquet, write_raw_json, RAW_DIR
+
+# transform_games emits one row per team-game; the upsert collapses them onto game_id
+INSERT_GAME_SQL = '''
+INSERT INTO dim_games (
+    game_id, game_date, season, season_type, inserted_at, updated_at
+) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(game_id) DO UPDATE SET
+    game_date = excluded.game_date,
+    season = excluded.season,
+    season_type = excluded.season_type,
+    updated_at = excluded.updated_at
+'''
+
+INSERT_GAME_STATS_SQL = '''
+INSERT OR REPLACE INTO fact_game_stats (
+    game_id, home_team_id, away_team_id, home_team_score, away_team_score, inserted_at
+) VALUES (?, ?, ?, ?, ?, ?)
+'''
 
 def extract_games(days_back=7):
     """Extract games data from NBA API"""
@@ -29,10 +48,9 @@ def extract_games(days_back=7):
         
         # Save raw data
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        raw_file = os.path.join(RAW_DIR, f"games_{timestamp}.json")
-        with open(raw_file, 'w') as f:
-            json.dump(games_dict, f, indent=2)
-        logger.info(f"Raw data saved to {raw_file}")
+        raw_file = os.path.join(RAW_DIR, f"games_{timestamp}.json.gz")
+        if write_raw_json(raw_file, games_dict) is not None:
+            logger.info(f"Raw data queued for {raw_file}")
         
         return games_dict
     except Exception as e:
@@ -49,58 +67,37 @@ def transform_games(games_dict):
     
     if 'resultSets' in games_dict and len(games_dict['resultSets']) > 0:
         result_set = games_dict['resultSets'][0]
-        headers = result_set['headers']
-        rows = result_set['rowSet']
-        
-        # Process games
-        unique_games = {}
+        df = pd.DataFrame(result_set['rowSet'], columns=result_set['headers'])
         
-        for row in rows:
-            game_dict = dict(zip(headers, row))
-            game_id = game_dict.get('GAME_ID')
-            
-            # Process unique games only
-            if game_id not in unique_games:
-                unique_games[game_id] = {
-                    'game_id': game_id,
-                    'game_date': game_dict.get('GAME_DATE'),
-                    'season': game_dict.get('SEASON_ID'),
-                    'season_type': 'Regular Season' if game_dict.get('SEASON_ID', '').startswith('2') else 'Playoffs'
-                }
-                games.append(unique_games[game_id])
-            
-            # Add team to track home/away
-            team_id = str(game_dict.get('TEAM_ID'))
-            is_home = game_dict.get('MATCHUP', '').find(' vs. ') != -1
+        if not df.empty:
+            # One game row per team row; load_games deduplicates on game_id
+            season_ids = df['SEASON_ID'].fillna('').astype(str)
+            games = pd.DataFrame({
+                'game_id': df['GAME_ID'],
+                'game_date': df['GAME_DATE'],
+                'season': df['SEASON_ID'],
+                'season_type': np.where(season_ids.str.startswith('2'), 'Regular Season', 'Playoffs')
+            }).to_dict('records')
             
-            if 'teams' not in unique_games[game_id]:
-                unique_games[game_id]['teams'] = []
+            # Pair the first home row with the first away row of each game
+            df['is_home'] = df['MATCHUP'].fillna('').str.contains(' vs. ', regex=False)
+            df['TEAM_ID'] = df['TEAM_ID'].astype(str)
+            points = df['PTS'].astype('Int64').astype(object)
+            df['PTS'] = points.where(points.notna(), None)
+            sides = df.drop_duplicates(['GAME_ID', 'is_home'])
+            home = sides[sides['is_home']]
+            away = sides[~sides['is_home']]
+            paired = home.merge(away, on='GAME_ID', suffixes=('_home', '_away'))
             
-            unique_games[game_id]['teams'].append({
-                'team_id': team_id,
-                'is_home': is_home,
-                'points': game_dict.get('PTS')
-            })
+            game_stats = pd.DataFrame({
+                'game_id': paired['GAME_ID'],
+                'home_team_id': paired['TEAM_ID_home'],
+                'away_team_id': paired['TEAM_ID_away'],
+                'home_team_score': paired['PTS_home'],
+                'away_team_score': paired['PTS_away']
+            }).to_dict('records')
     
-    # Create game stats
-    for game_id, game in unique_games.items():
-        if 'teams' in game and len(game['teams']) >= 2:
-            home_teams = [t for t in game['teams'] if t['is_home']]
-            away_teams = [t for t in game['teams'] if not t['is_home']]
-            
-            if home_teams and away_teams:
-                home_team = home_teams[0]
-                away_team = away_teams[0]
-                
-                game_stats.append({
-                    'game_id': game_id,
-                    'home_team_id': home_team['team_id'],
-                    'away_team_id': away_team['team_id'],
-                    'home_team_score': home_team['points'],
-                    'away_team_score': away_team['points']
-                })
-    
-    logger.info(f"Transformed {len(games)} games and {len(game_stats)} game stats")
+    logger.info(f"Transformed {len(games)} game rows and {len(game_stats)} game stats")
     return games, game_stats
 
 def load_games(games, game_stats):
@@ -112,50 +109,34 @@ def load_games(games, game_stats):
     cursor = conn.cursor()
     
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    games_loaded = 0
-    stats_loaded = 0
+    game_rows = [
+        (game['game_id'], game['game_date'], game['season'], game['season_type'], now, now)
+        for game in games
+    ]
+    stat_rows = [
+        (
+            stat['game_id'],
+            stat['home_team_id'],
+            stat['away_team_id'],
+            stat['home_team_score'],
+            stat['away_team_score'],
+            now
+        )
+        for stat in game_stats
+    ]
     
     try:
-        # Load dim_games
-        for game in games:
-            cursor.execute('''
-            INSERT OR REPLACE INTO dim_games (
-                game_id, game_date, season, season_type, inserted_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                game['game_id'],
-                game['game_date'],
-                game['season'],
-                game['season_type'],
-                now,
-                now
-            ))
-            games_loaded += 1
+        # Upsert dim_games and load fact_game_stats in a single transaction
+        cursor.executemany(INSERT_GAME_SQL, game_rows)
         
-        # Load fact_game_stats
-        for stat in game_stats:
-            cursor.execute('''
-            INSERT OR REPLACE INTO fact_game_stats (
-                game_id, home_team_id, away_team_id, home_team_score, away_team_score, inserted_at
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                stat['game_id'],
-                stat['home_team_id'],
-                stat['away_team_id'],
-                stat['home_team_score'],
-                stat['away_team_score'],
-                now
-            ))
-            stats_loaded += 1
+        cursor.executemany(INSERT_GAME_STATS_SQL, stat_rows)
         
         conn.commit()
-        logger.info(f"Loaded {games_loaded} games and {stats_loaded} game stats into database")
+        logger.info(f"Loaded {len(game_rows)} game rows and {len(stat_rows)} game stats into database")
     except Exception as e:
         conn.rollback()
         logger.error(f"Error loading games: {e}")
         raise
-    finally:
-        conn.close()
 
 def games_etl(days_back=7):
     """Run the full games ETL process"""
@@ -169,6 +150,12 @@ def games_etl(days_back=7):
         # Transform
         games, game_stats = transform_games(games_dict)
         
+        # Archive the transformed rows for reprocessing and analysis
+        for name, rows in (("games", games), ("game_stats", game_stats)):
+            parquet_file = write_processed_parquet(rows, name)
+            if parquet_file:
+                logger.info(f"Processed {name} queued for {parquet_file}")
+        
         # Load
         load_games(games, game_stats)
         
@@ -1,12 +1,82 @@
 # etl/player_game_stats_etl.py
 import json
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from operator import itemgetter
 
 from nba_api.stats.endpoints import boxscoretraditionalv2
 
-from config.etl_settings import get_logger, get_db_connection, RAW_DIR
+from config.etl_settings import get_logger, get_db_connection, write_raw_json, RAW_DIR, TokenBucket
+
+# Concurrent box score fetches, paced to stay under the stats.nba.com rate limit
+MAX_WORKERS = 4
+REQUESTS_PER_SECOND = 1.0
+
+# Box score columns copied into fact_player_game_stats, in insert order
+STAT_COLUMNS = ('MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO')
+
+# Endpoint name recorded in etl_runs for box scores that came back without rows
+BOX_SCORE_ENDPOINT = "boxscoretraditionalv2"
+
+# How long get_recent_games waits before fetching an empty box score again;
+# in-progress and unpublished games return no player rows yet
+EMPTY_BOX_SCORE_RETRY_DELAY = timedelta(hours=1)
+
+INSERT_PLAYER_GAME_STATS_SQL = '''
+INSERT OR REPLACE INTO fact_player_game_stats (
+    player_game_id, game_id, player_id, team_id,
+    minutes, points, rebounds, assists, steals, blocks, turnovers,
+    inserted_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_MISSING_PLAYER_SQL = '''
+INSERT OR IGNORE INTO dim_players (player_id, inserted_at, updated_at)
+VALUES (?, ?, ?)
+'''
+
+INSERT_ETL_RUN_SQL = '''
+INSERT OR REPLACE INTO etl_runs (endpoint, game_id, attempted_at, retry_after)
+VALUES (?, ?, ?, ?)
+'''
+
+DELETE_ETL_RUN_SQL = '''
+DELETE FROM etl_runs WHERE endpoint = ? AND game_id = ?
+'''
+
+_rate_limiter = TokenBucket(REQUESTS_PER_SECOND, capacity=MAX_WORKERS)
+
+# Set once etl_runs has been created, so its DDL runs once per process
+_etl_runs_ready = False
+
+def ensure_etl_runs_table(conn):
+    """Create the etl_runs ledger of games whose box score has to be fetched again later
+    
+    Loaded games are already skipped through fact_player_game_stats; etl_runs
+    only holds the attempts that loaded nothing, with the time to retry them.
+    """
+    global _etl_runs_ready
+    if _etl_runs_ready:
+        return
+    
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA table_info(etl_runs)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if columns and 'retry_after' not in columns:
+        # Older ledgers only marked loaded games, which fact_player_game_stats covers
+        cursor.execute("DROP TABLE etl_runs")
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS etl_runs (
+        endpoint TEXT NOT NULL,
+        game_id TEXT NOT NULL,
+        attempted_at TIMESTAMP,
+        retry_after TIMESTAMP,
+        PRIMARY KEY (endpoint, game_id)
+    )
+    ''')
+    _etl_runs_ready = True
 
 def extract_player_stats(game_id):
     """Extract player game stats for a specific game"""
@@ -14,8 +84,8 @@ def extract_player_stats(game_id):
     logger.info(f"Extracting player stats for game {game_id}")
     
     try:
-        # Add a delay to avoid hitting API rate limits
-        time.sleep(1)
+        # Wait for a request token to avoid hitting API rate limits
+        _rate_limiter.acquire()
         
         # Get box score
         box_score = boxscoretraditionalv2.BoxScoreTraditionalV2(game_id=game_id)
@@ -23,10 +93,9 @@ def extract_player_stats(game_id):
         
         # Save raw data
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        raw_file = os.path.join(RAW_DIR, f"boxscore_{game_id}_{timestamp}.json")
-        with open(raw_file, 'w') as f:
-            json.dump(box_score_dict, f, indent=2)
-        logger.info(f"Raw box score data saved to {raw_file}")
+        raw_file = os.path.join(RAW_DIR, f"boxscore_{game_id}_{timestamp}.json.gz")
+        if write_raw_json(raw_file, box_score_dict) is not None:
+            logger.info(f"Raw box score data queued for {raw_file}")
         
         return box_score_dict
     except Exception as e:
@@ -34,7 +103,12 @@ def extract_player_stats(game_id):
         raise
 
 def transform_player_stats(box_score_dict, game_id):
-    """Transform player game stats"""
+    """Transform player game stats
+    
+    Each stat is a tuple in fact_player_game_stats insert order:
+    (player_game_id, game_id, player_id, team_id, minutes, points,
+    rebounds, assists, steals, blocks, turnovers).
+    """
     logger = get_logger("player_game_stats_etl")
     logger.info(f"Transforming player stats for game {game_id}")
     
@@ -44,37 +118,34 @@ def transform_player_stats(box_score_dict, game_id):
     if 'resultSets' in box_score_dict:
         for result_set in box_score_dict['resultSets']:
             if result_set['name'] == 'PlayerStats':
-                headers = result_set['headers']
-                rows = result_set['rowSet']
+                # Resolve column positions once per result set
+                columns = {header: i for i, header in enumerate(result_set['headers'])}
+                player_idx = columns['PLAYER_ID']
+                team_idx = columns['TEAM_ID']
+                get_stats = itemgetter(*(columns[col] for col in STAT_COLUMNS))
                 
-                for row in rows:
-                    player_dict = dict(zip(headers, row))
-                    player_id = str(player_dict.get('PLAYER_ID'))
+                for row in result_set['rowSet']:
+                    player_id = str(row[player_idx])
                     player_ids.add(player_id)
                     
-                    # Create player_game_id
-                    player_game_id = f"{game_id}_{player_id}"
-                    
-                    # Basic player stats
-                    player_stats.append({
-                        'player_game_id': player_game_id,
-                        'game_id': game_id,
-                        'player_id': player_id,
-                        'team_id': str(player_dict.get('TEAM_ID')),
-                        'minutes': player_dict.get('MIN'),
-                        'points': player_dict.get('PTS'),
-                        'rebounds': player_dict.get('REB'),
-                        'assists': player_dict.get('AST'),
-                        'steals': player_dict.get('STL'),
-                        'blocks': player_dict.get('BLK'),
-                        'turnovers': player_dict.get('TO')
-                    })
+                    # Key columns followed by the basic player stats
+                    player_stats.append(
+                        (f"{game_id}_{player_id}", game_id, player_id, str(row[team_idx]))
+                        + get_stats(row)
+                    )
     
     logger.info(f"Transformed {len(player_stats)} player game stats")
     return player_stats, player_ids
 
-def load_player_stats(player_stats):
-    """Load player game stats into the database"""
+def load_player_stats(player_stats, game_id=None, player_ids=()):
+    """Load player game stats into the database
+    
+    Players in player_ids missing from dim_players are added in the same
+    transaction. When game_id is given and the box score had no rows (e.g. a
+    game not yet published), the game is recorded in etl_runs so
+    get_recent_games waits EMPTY_BOX_SCORE_RETRY_DELAY before fetching it
+    again; once its rows load, the entry is cleared.
+    """
     logger = get_logger("player_game_stats_etl")
     logger.info("Starting player game stats load")
     
@@ -82,42 +153,33 @@ def load_player_stats(player_stats):
     cursor = conn.cursor()
     
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    count = 0
+    rows = [stat + (now,) for stat in player_stats]
     
     try:
-        for stat in player_stats:
-            cursor.execute('''
-            INSERT OR REPLACE INTO fact_player_game_stats (
-                player_game_id, game_id, player_id, team_id,
-                minutes, points, rebounds, assists, steals, blocks, turnovers,
-                inserted_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                stat['player_game_id'],
-                stat['game_id'],
-                stat['player_id'],
-                stat['team_id'],
-                stat['minutes'],
-                stat['points'],
-                stat['rebounds'],
-                stat['assists'],
-                stat['steals'],
-                stat['blocks'],
-                stat['turnovers'],
-                now
-            ))
-            count += 1
+        cursor.executemany(INSERT_PLAYER_GAME_STATS_SQL, rows)
+        
+        # Register players seen in the box score that players_etl has not loaded
+        cursor.executemany(
+            INSERT_MISSING_PLAYER_SQL,
+            [(player_id, now, now) for player_id in player_ids]
+        )
+        
+        if game_id is not None:
+            if rows:
+                cursor.execute(DELETE_ETL_RUN_SQL, (BOX_SCORE_ENDPOINT, game_id))
+            else:
+                retry_after = (datetime.now() + EMPTY_BOX_SCORE_RETRY_DELAY).strftime("%Y-%m-%d %H:%M:%S")
+                cursor.execute(INSERT_ETL_RUN_SQL, (BOX_SCORE_ENDPOINT, game_id, now, retry_after))
+                logger.info(f"No player stats for game {game_id} yet; retrying after {retry_after}")
         
         conn.commit()
-        logger.info(f"Loaded {count} player game stats into database")
+        logger.info(f"Loaded {len(rows)} player game stats into database")
     except Exception as e:
         conn.rollback()
         logger.error(f"Error loading player game stats: {e}")
         raise
-    finally:
-        conn.close()
 
-def get_recent_games(days_back=7):
+def get_recent_games(days_back=7, limit=5):
     """Get recent games from the database that need player stats"""
     logger = get_logger("player_game_stats_etl")
     logger.info(f"Getting recent games from the last {days_back} days")
@@ -130,16 +192,24 @@ def get_recent_games(days_back=7):
         today = datetime.now().date()
         past_date = (today - timedelta(days=days_back)).strftime("%Y-%m-%d")
         
-        # Find games without player stats
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        ensure_etl_runs_table(conn)
+        
+        # Find games without player stats whose empty box score is not waiting to be retried
         cursor.execute('''
         SELECT g.game_id
         FROM dim_games g
-        LEFT JOIN fact_player_game_stats ps ON g.game_id = ps.game_id
         WHERE g.game_date >= ?
-        GROUP BY g.game_id
-        HAVING COUNT(ps.player_game_id) = 0
-        LIMIT 5
-        ''', (past_date,))
+        AND NOT EXISTS (
+            SELECT 1 FROM fact_player_game_stats ps WHERE ps.game_id = g.game_id
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM etl_runs r
+            WHERE r.endpoint = ? AND r.game_id = g.game_id AND r.retry_after > ?
+        )
+        LIMIT ?
+        ''', (past_date, BOX_SCORE_ENDPOINT, now, limit))
         
         game_ids = [row['game_id'] for row in cursor.fetchall()]
         logger.info(f"Found {len(game_ids)} recent games without player stats")
@@ -147,8 +217,17 @@ def get_recent_games(days_back=7):
     except Exception as e:
         logger.error(f"Error getting recent games: {e}")
         return []
-    finally:
-        conn.close()
+
+def get_unloaded_games(game_ids):
+    """Drop the games whose player stats are already in fact_player_game_stats"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT DISTINCT game_id FROM fact_player_game_stats WHERE game_id IN (SELECT value FROM json_each(?))",
+        (json.dumps(game_ids),)
+    )
+    loaded_game_ids = {row['game_id'] for row in cursor.fetchall()}
+    return [game_id for game_id in game_ids if game_id not in loaded_game_ids]
 
 def player_game_stats_etl(game_ids=None, days_back=7):
     """Run the full player game stats ETL process"""
@@ -156,9 +235,17 @@ def player_game_stats_etl(game_ids=None, days_back=7):
     logger.info("Starting player game stats ETL process")
     
     try:
+        ensure_etl_runs_table(get_db_connection())
+        
         # Get games to process if not provided
         if game_ids is None:
             game_ids = get_recent_games(days_back)
+        else:
+            # Explicit game IDs skip the already-loaded games, like get_recent_games
+            game_ids = get_unloaded_games(list(game_ids))
+        
+        # Drop duplicate game IDs so each box score is fetched once
+        game_ids = list(dict.fromkeys(game_ids))
         
         if not game_ids:
             logger.info("No games to process")
@@ -166,21 +253,29 @@ def player_game_stats_etl(game_ids=None, days_back=7):
         
         stats_count = 0
         
-        # Process each game
-        for game_id in game_ids:
-            # Extract
-            box_score_dict = extract_player_stats(game_id)
-            
-            # Transform
-            player_stats, player_ids = transform_player_stats(box_score_dict, game_id)
-            
-            # Load
-            load_player_stats(player_stats)
-            
-            stats_count += len(player_stats)
+        # Fetch box scores concurrently and load each one as it arrives
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {executor.submit(extract_player_stats, game_id): game_id for game_id in game_ids}
             
-            # Small delay between API calls
-            time.sleep(1)
+            try:
+                for future in as_completed(futures):
+                    game_id = futures[future]
+                    
+                    # Extract
+                    box_score_dict = future.result()
+                    
+                    # Transform
+                    player_stats, player_ids = transform_player_stats(box_score_dict, game_id)
+                    
+                    # Load
+                    load_player_stats(player_stats, game_id, player_ids)
+                    
+                    stats_count += len(player_stats)
+            except BaseException:
+                # Cancel the queued fetches so a failing run stops spending API requests;
+                # leaving the with block then only waits for the ones already in flight
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
         
         logger.info(f"Player game stats ETL process completed successfully with {stats_count} stats loaded")
         return True
@@ -1,11 +1,16 @@
 # etl/players_etl.py
-import json
 import os
 from datetime import datetime
 
 from nba_api.stats.static import players
 
-from config.etl_settings import get_logger, get_db_connection, RAW_DIR
+from config.etl_settings import get_logger, get_db_connection, write_raw_json, RAW_DIR
+
+INSERT_PLAYER_SQL = '''
+INSERT OR REPLACE INTO dim_players (
+    player_id, first_name, last_name, inserted_at, updated_at
+) VALUES (?, ?, ?, ?, ?)
+'''
 
 def extract_players(limit=None):
     """Extract player data from NBA API"""
@@ -26,10 +31,9 @@ def extract_players(limit=None):
         
         # Save raw data
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        raw_file = os.path.join(RAW_DIR, f"players_{timestamp}.json")
-        with open(raw_file, 'w') as f:
-            json.dump(player_subset, f, indent=2)
-        logger.info(f"Raw data saved to {raw_file}")
+        raw_file = os.path.join(RAW_DIR, f"players_{timestamp}.json.gz")
+        if write_raw_json(raw_file, player_subset) is not None:
+            logger.info(f"Raw data queued for {raw_file}")
         
         return player_subset
     except Exception as e:
@@ -61,31 +65,20 @@ def load_players(transformed_players):
     cursor = conn.cursor()
     
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    count = 0
+    rows = [
+        (player['player_id'], player['first_name'], player['last_name'], now, now)
+        for player in transformed_players
+    ]
     
     try:
-        for player in transformed_players:
-            cursor.execute('''
-            INSERT OR REPLACE INTO dim_players (
-                player_id, first_name, last_name, inserted_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?)
-            ''', (
-                player['player_id'],
-                player['first_name'],
-                player['last_name'],
-                now,
-                now
-            ))
-            count += 1
+        cursor.executemany(INSERT_PLAYER_SQL, rows)
         
         conn.commit()
-        logger.info(f"Loaded {count} players into database")
+        logger.info(f"Loaded {len(rows)} players into database")
     except Exception as e:
         conn.rollback()
         logger.error(f"Error loading players: {e}")
         raise
-    finally:
-        conn.close()
 
 def players_etl(limit=None):
     """Run the full players ETL process"""
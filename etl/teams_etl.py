@@ -1,12 +1,18 @@
 # etl/teams_etl.py
-import json
 import os
 import time
 from datetime import datetime
 
 from nba_api.stats.static import teams
 
-from config.etl_settings import get_logger, get_db_connection, RAW_DIR
+from config.etl_settings import get_logger, get_db_connection, write_raw_json, RAW_DIR
+
+INSERT_TEAM_SQL = '''
+INSERT OR REPLACE INTO dim_teams (
+    team_id, team_name, team_city, team_abbreviation,
+    conference, division, inserted_at, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
 
 def extract_teams():
     """Extract team data from NBA API"""
@@ -20,10 +26,9 @@ def extract_teams():
         
         # Save raw data
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        raw_file = os.path.join(RAW_DIR, f"teams_{timestamp}.json")
-        with open(raw_file, 'w') as f:
-            json.dump(nba_teams, f, indent=2)
-        logger.info(f"Raw data saved to {raw_file}")
+        raw_file = os.path.join(RAW_DIR, f"teams_{timestamp}.json.gz")
+        if write_raw_json(raw_file, nba_teams) is not None:
+            logger.info(f"Raw data queued for {raw_file}")
         
         return nba_teams
     except Exception as e:
@@ -58,35 +63,29 @@ def load_teams(transformed_teams):
     cursor = conn.cursor()
     
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    count = 0
+    rows = [
+        (
+            team['team_id'],
+            team['team_name'],
+            team['team_city'],
+            team['team_abbreviation'],
+            team['conference'],
+            team['division'],
+            now,
+            now
+        )
+        for team in transformed_teams
+    ]
     
     try:
-        for team in transformed_teams:
-            cursor.execute('''
-            INSERT OR REPLACE INTO dim_teams (
-                team_id, team_name, team_city, team_abbreviation,
-                conference, division, inserted_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                team['team_id'],
-                team['team_name'],
-                team['team_city'],
-                team['team_abbreviation'],
-                team['conference'],
-                team['division'],
-                now,
-                now
-            ))
-            count += 1
+        cursor.executemany(INSERT_TEAM_SQL, rows)
         
         conn.commit()
-        logger.info(f"Loaded {count} teams into database")
+        logger.info(f"Loaded {len(rows)} teams into database")
     except Exception as e:
         conn.rollback()
         logger.error(f"Error loading teams: {e}")
         raise
-    finally:
-        conn.close()
 
 def teams_etl():
     """Run the full teams ETL process"""
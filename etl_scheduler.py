@@ -1,4 +1,3 @@
-import schedule
 import time
 import sys
 from pathlib import Path
@@ -58,6 +57,9 @@ def run_all_etl():
     logger.info("All ETL jobs completed")
 
 if __name__ == "__main__":
+    # Imported here so that importing the run_* jobs does not load the scheduler library
+    import schedule
+    
     logger.info("Starting ETL scheduler")
     
     # Setup schedule
@@ -81,6 +83,8 @@ if __name__ == "__main__":
     try:
         while True:
             schedule.run_pending()
-            time.sleep(60)
+            # Sleep until the next job is due instead of waking every minute
+            idle_seconds = schedule.idle_seconds()
+            time.sleep(max(idle_seconds, 0) if idle_seconds is not None else 60)
     except KeyboardInterrupt:
         logger.info("Scheduler stopped by user")
@@ -4,18 +4,25 @@ NBA Data Warehouse - Scheduled ETL Job
 This script runs a scheduled ETL process to keep the NBA data warehouse up-to-date.
 It handles extraction, transformation, and loading for all tables in the database.
 """
+import gzip
 import json
 import os
 import sqlite3
-import pandas as pd
-import numpy as np
 import time
+import random
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
 import schedule
 import sys
-from http.client import RemoteDisconnected
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache
+from operator import itemgetter
+import requests
+
+from config.etl_settings import DB_PRAGMAS, RAW_COMPRESS_LEVEL, TokenBucket, evict_http_cache
 
 # Configure logging
 logging.basicConfig(
@@ -39,6 +46,24 @@ except ImportError:
     logger.error("Error: nba_api package not installed. Run: pip install nba_api")
     sys.exit(1)
 
+# orjson is optional; the stdlib encoder produces the same compact JSON, only slower
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+# nba_api ships the team and player lists as static data, so scheduled runs in
+# the same process reuse the first copy. Callers must not mutate the result.
+@lru_cache(maxsize=1)
+def _static_teams():
+    return teams.get_teams()
+
+@lru_cache(maxsize=1)
+def _static_active_players():
+    return players.get_active_players()
+
 # Create directories
 os.makedirs("data/raw", exist_ok=True)
 os.makedirs("data/processed", exist_ok=True)
@@ -46,6 +71,352 @@ os.makedirs("data/processed", exist_ok=True)
 # Database settings
 DATABASE_PATH = "data/processed/nba_data.db"
 RAW_DATA_DIR = "data/raw"
+# Prepared statements kept per connection; the default of 128 is shared with every ad-hoc query
+DB_CACHED_STATEMENTS = 256
+
+# Box scores and shot charts are fetched concurrently, paced by one token
+# bucket shared by every stats.nba.com request. Responses with 429 are retried
+# by the shared session in config.etl_settings, which honours Retry-After.
+# Games are fetched on threads rather than processes: the load is bound by
+# this bucket, not the CPU, and one in-process bucket keeps the rate global.
+API_WORKERS = 4
+API_REQUESTS_PER_SECOND = 1.0
+_api_limiter = TokenBucket(API_REQUESTS_PER_SECOND, capacity=API_WORKERS)
+
+# Connection errors are retried on the pool's worker threads with exponential
+# backoff; the jitter keeps workers that failed together from retrying in lockstep.
+# This stacks on NBA_SESSION's urllib3 Retry(total=5), which already retries each
+# request's connect and read failures and 429/5xx responses with short backoff.
+# An error only reaches this layer once those are used up, so a request that keeps
+# failing is attempted up to API_MAX_RETRIES * (5 + 1) times.
+API_MAX_RETRIES = 3
+API_RETRY_DELAY = 5  # seconds, doubled after each failed attempt
+
+# nba_api calls go through requests, whose connection and timeout errors don't
+# subclass the builtins; RetryError is raised once urllib3 gives up on a status
+API_RETRY_ERRORS = (
+    requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+    requests.exceptions.RetryError, ConnectionError, TimeoutError,
+)
+
+def _retry_backoff(attempt):
+    """Seconds to sleep after a failed attempt (0-based): exponential backoff with equal jitter"""
+    delay = API_RETRY_DELAY * 2 ** attempt
+    return delay / 2 + random.uniform(0, delay / 2)
+
+# sqlite3.OperationalError messages for tables or columns an older warehouse lacks
+SCHEMA_MISMATCH_ERRORS = ("no such table", "no such column", "has no column named")
+
+def _is_schema_mismatch(error):
+    """True if error is SQLite reporting a missing table or column, not a lock or I/O failure"""
+    message = str(error)
+    return any(fragment in message for fragment in SCHEMA_MISMATCH_ERRORS)
+
+PLAYER_GAME_STATS_COLUMNS = (
+    "player_game_id", "game_id", "player_id", "team_id", "date_id",
+    "minutes_played", "points", "assists", "rebounds", "steals", "blocks", "turnovers",
+    "personal_fouls", "fg_made", "fg_attempted", "fg_pct", "fg3_made", "fg3_attempted", "fg3_pct",
+    "ft_made", "ft_attempted", "ft_pct", "plus_minus", "inserted_at"
+)
+
+# Indexes on the fact tables' foreign keys so joins to the dimensions avoid full scans
+WAREHOUSE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_fgs_home_team_id ON fact_game_stats(home_team_id)",
+    "CREATE INDEX IF NOT EXISTS ix_fgs_away_team_id ON fact_game_stats(away_team_id)",
+    "CREATE INDEX IF NOT EXISTS ix_pgs_player_team_game ON fact_player_game_stats(player_id, team_id, game_id)",
+    "CREATE INDEX IF NOT EXISTS ix_pgs_game_id ON fact_player_game_stats(game_id)",
+]
+
+# Loads of at least this many games drop the secondary indexes on these tables
+# first and rebuild them in one sorted pass at the end, instead of updating them per row.
+# The daily run loads at most 5 games, so only --backfill runs reach this
+BULK_LOAD_MIN_GAMES = 50
+PLAYER_STATS_TABLES = (
+    "fact_player_game_stats", "fact_player_shot_tracking", "fact_player_defensive",
+    "fact_player_efficiency", "fact_player_hustle", "fact_player_playmaking",
+)
+
+# Box score columns loaded into fact_player_game_stats, in insert order
+BOX_SCORE_STAT_FIELDS = (
+    'MIN', 'PTS', 'AST', 'REB', 'STL', 'BLK', 'TO', 'PF',
+    'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT',
+    'FTM', 'FTA', 'FT_PCT', 'PLUS_MINUS'
+)
+
+# Advanced and tracking box score columns read per player, in unpacking order;
+# any the API omits read as None
+ADVANCED_STAT_FIELDS = (
+    'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'EFG_PCT', 'TS_PCT', 'OREB_PCT',
+    'DREB_PCT', 'REB_PCT', 'AST_PCT', 'STL_PCT', 'BLK_PCT', 'USG_PCT'
+)
+TRACKING_STAT_FIELDS = (
+    'DIST_MILES', 'DIST_MILES_OFF', 'DIST_MILES_DEF', 'AVG_SPEED', 'AVG_SPEED_OFF',
+    'AVG_SPEED_DEF', 'POTENTIAL_AST', 'AST_PTS_CREATED', 'PASSES_MADE', 'PASSES_RECEIVED'
+)
+
+# Shot chart zones and the fact_player_shot_tracking bucket they count toward.
+# Mid-Range is split into 10_16ft and 16ft_3pt by SHOT_ZONE_RANGE.
+SHOT_ZONE_BUCKETS = {
+    'Restricted Area': '0_3ft',
+    'In The Paint (Non-RA)': '3_10ft',
+    'Above the Break 3': 'above_break_3',
+    'Corner 3': 'corner_3',
+}
+
+# fact_player_shot_tracking buckets in column order
+SHOT_TRACKING_BUCKETS = ('0_3ft', '3_10ft', '10_16ft', '16ft_3pt', 'corner_3', 'above_break_3', 'dunk')
+
+# SQL statements, defined once so sqlite3 reuses its prepared statements
+# A date another run already inserted is left as is
+INSERT_DATE_SQL = """
+INSERT OR IGNORE INTO dim_dates (
+    date_id, full_date, day_of_week, day_name,
+    day_of_month, day_of_year, week_of_year,
+    month_num, month_name, quarter, year,
+    is_weekend, inserted_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Existing teams keep their original inserted_at
+UPSERT_TEAM_SQL = """
+INSERT INTO dim_teams (
+    team_id, team_name, team_city, team_abbreviation,
+    conference, division, inserted_at, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(team_id) DO UPDATE SET
+    team_name = excluded.team_name,
+    team_city = excluded.team_city,
+    team_abbreviation = excluded.team_abbreviation,
+    conference = excluded.conference,
+    division = excluded.division,
+    updated_at = excluded.updated_at
+"""
+
+# Existing players keep their original inserted_at
+UPSERT_PLAYER_SQL = """
+INSERT INTO dim_players (
+    player_id, first_name, last_name, inserted_at, updated_at
+) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(player_id) DO UPDATE SET
+    first_name = excluded.first_name,
+    last_name = excluded.last_name,
+    updated_at = excluded.updated_at
+"""
+
+# Players another run or game already inserted are left as is
+INSERT_PLAYER_SQL = """
+INSERT OR IGNORE INTO dim_players (
+    player_id, first_name, last_name, inserted_at, updated_at
+) VALUES (?, ?, ?, ?, ?)
+"""
+
+# dim_games rows keep their inserted_at and season_type once written
+UPSERT_GAME_SQL = """
+INSERT INTO dim_games (
+    game_id, game_date, season, season_type, inserted_at, updated_at
+) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(game_id) DO UPDATE SET
+    game_date = excluded.game_date,
+    season = excluded.season,
+    updated_at = excluded.updated_at
+"""
+
+UPSERT_GAME_STATS_SQL = """
+INSERT INTO fact_game_stats (
+    game_id, date_id, home_team_id, away_team_id,
+    home_team_score, away_team_score, inserted_at
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(game_id) DO UPDATE SET
+    date_id = excluded.date_id,
+    home_team_id = excluded.home_team_id,
+    away_team_id = excluded.away_team_id,
+    home_team_score = excluded.home_team_score,
+    away_team_score = excluded.away_team_score
+"""
+
+# For older warehouses whose fact_game_stats has no date_id column
+UPSERT_GAME_STATS_NO_DATE_SQL = """
+INSERT INTO fact_game_stats (
+    game_id, home_team_id, away_team_id,
+    home_team_score, away_team_score, inserted_at
+) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(game_id) DO UPDATE SET
+    home_team_id = excluded.home_team_id,
+    away_team_id = excluded.away_team_id,
+    home_team_score = excluded.home_team_score,
+    away_team_score = excluded.away_team_score
+"""
+
+INSERT_PLAYER_GAME_STATS_SQL = """
+INSERT OR REPLACE INTO fact_player_game_stats (
+    player_game_id, game_id, player_id, team_id, date_id,
+    minutes_played, points, assists, rebounds, steals, blocks, turnovers,
+    personal_fouls, fg_made, fg_attempted, fg_pct, fg3_made, fg3_attempted, fg3_pct,
+    ft_made, ft_attempted, ft_pct, plus_minus, inserted_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Existing shot tracking rows keep their original inserted_at. Rows are
+# (player_game_id, made/attempted per SHOT_TRACKING_BUCKETS, inserted_at);
+# the percentages are computed by SQLite from each made/attempted pair.
+UPSERT_SHOT_TRACKING_SQL = """
+INSERT INTO fact_player_shot_tracking (
+    player_game_id, shots_made_0_3ft, shots_attempted_0_3ft, shots_pct_0_3ft,
+    shots_made_3_10ft, shots_attempted_3_10ft, shots_pct_3_10ft,
+    shots_made_10_16ft, shots_attempted_10_16ft, shots_pct_10_16ft,
+    shots_made_16ft_3pt, shots_attempted_16ft_3pt, shots_pct_16ft_3pt,
+    corner_3_made, corner_3_attempted, corner_3_pct,
+    above_break_3_made, above_break_3_attempted, above_break_3_pct,
+    dunk_made, dunk_attempted, inserted_at
+) VALUES (
+    ?1, ?2, ?3, CASE WHEN ?3 > 0 THEN 1.0 * ?2 / ?3 END,
+    ?4, ?5, CASE WHEN ?5 > 0 THEN 1.0 * ?4 / ?5 END,
+    ?6, ?7, CASE WHEN ?7 > 0 THEN 1.0 * ?6 / ?7 END,
+    ?8, ?9, CASE WHEN ?9 > 0 THEN 1.0 * ?8 / ?9 END,
+    ?10, ?11, CASE WHEN ?11 > 0 THEN 1.0 * ?10 / ?11 END,
+    ?12, ?13, CASE WHEN ?13 > 0 THEN 1.0 * ?12 / ?13 END,
+    ?14, ?15, ?16
+)
+ON CONFLICT(player_game_id) DO UPDATE SET
+    shots_made_0_3ft = excluded.shots_made_0_3ft,
+    shots_attempted_0_3ft = excluded.shots_attempted_0_3ft,
+    shots_pct_0_3ft = excluded.shots_pct_0_3ft,
+    shots_made_3_10ft = excluded.shots_made_3_10ft,
+    shots_attempted_3_10ft = excluded.shots_attempted_3_10ft,
+    shots_pct_3_10ft = excluded.shots_pct_3_10ft,
+    shots_made_10_16ft = excluded.shots_made_10_16ft,
+    shots_attempted_10_16ft = excluded.shots_attempted_10_16ft,
+    shots_pct_10_16ft = excluded.shots_pct_10_16ft,
+    shots_made_16ft_3pt = excluded.shots_made_16ft_3pt,
+    shots_attempted_16ft_3pt = excluded.shots_attempted_16ft_3pt,
+    shots_pct_16ft_3pt = excluded.shots_pct_16ft_3pt,
+    corner_3_made = excluded.corner_3_made,
+    corner_3_attempted = excluded.corner_3_attempted,
+    corner_3_pct = excluded.corner_3_pct,
+    above_break_3_made = excluded.above_break_3_made,
+    above_break_3_attempted = excluded.above_break_3_attempted,
+    above_break_3_pct = excluded.above_break_3_pct,
+    dunk_made = excluded.dunk_made,
+    dunk_attempted = excluded.dunk_attempted
+"""
+
+# The advanced and tracking box scores each fill a subset of a table's columns,
+# so their upserts only overwrite the columns they insert
+UPSERT_EFFICIENCY_SQL = """
+INSERT INTO fact_player_efficiency (
+    player_game_id, true_shooting_pct, effective_fg_pct,
+    offensive_rating, offensive_rebound_pct,
+    defensive_rebound_pct, total_rebound_pct,
+    net_rating, inserted_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(player_game_id) DO UPDATE SET
+    true_shooting_pct = excluded.true_shooting_pct,
+    effective_fg_pct = excluded.effective_fg_pct,
+    offensive_rating = excluded.offensive_rating,
+    offensive_rebound_pct = excluded.offensive_rebound_pct,
+    defensive_rebound_pct = excluded.defensive_rebound_pct,
+    total_rebound_pct = excluded.total_rebound_pct,
+    net_rating = excluded.net_rating
+"""
+
+UPSERT_DEFENSIVE_RATING_SQL = """
+INSERT INTO fact_player_defensive (
+    player_game_id, defensive_rating,
+    steal_pct, block_pct,
+    inserted_at
+) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(player_game_id) DO UPDATE SET
+    defensive_rating = excluded.defensive_rating,
+    steal_pct = excluded.steal_pct,
+    block_pct = excluded.block_pct
+"""
+
+UPSERT_PLAYMAKING_PCT_SQL = """
+INSERT INTO fact_player_playmaking (
+    player_game_id, assist_pct, usage_pct, inserted_at
+) VALUES (?, ?, ?, ?)
+ON CONFLICT(player_game_id) DO UPDATE SET
+    assist_pct = excluded.assist_pct,
+    usage_pct = excluded.usage_pct
+"""
+
+UPSERT_HUSTLE_TRACKING_SQL = """
+INSERT INTO fact_player_hustle (
+    player_game_id, distance_miles, distance_miles_offense,
+    distance_miles_defense, avg_speed_mph, avg_speed_mph_offense,
+    avg_speed_mph_defense, inserted_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(player_game_id) DO UPDATE SET
+    distance_miles = excluded.distance_miles,
+    distance_miles_offense = excluded.distance_miles_offense,
+    distance_miles_defense = excluded.distance_miles_defense,
+    avg_speed_mph = excluded.avg_speed_mph,
+    avg_speed_mph_offense = excluded.avg_speed_mph_offense,
+    avg_speed_mph_defense = excluded.avg_speed_mph_defense
+"""
+
+UPSERT_PLAYMAKING_TRACKING_SQL = """
+INSERT INTO fact_player_playmaking (
+    player_game_id, potential_assists,
+    assist_points_created, passes_made,
+    passes_received, inserted_at
+) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(player_game_id) DO UPDATE SET
+    potential_assists = excluded.potential_assists,
+    assist_points_created = excluded.assist_points_created,
+    passes_made = excluded.passes_made,
+    passes_received = excluded.passes_received
+"""
+
+UPSERT_HUSTLE_SQL = """
+INSERT INTO fact_player_hustle (
+    player_game_id,
+    contested_shots_2pt,
+    contested_shots_3pt,
+    deflections,
+    loose_balls_recovered,
+    charges_drawn,
+    screen_assists,
+    screen_assist_points,
+    box_outs,
+    box_outs_offensive,
+    box_outs_defensive,
+    inserted_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(player_game_id) DO UPDATE SET
+    contested_shots_2pt = excluded.contested_shots_2pt,
+    contested_shots_3pt = excluded.contested_shots_3pt,
+    deflections = excluded.deflections,
+    loose_balls_recovered = excluded.loose_balls_recovered,
+    charges_drawn = excluded.charges_drawn,
+    screen_assists = excluded.screen_assists,
+    screen_assist_points = excluded.screen_assist_points,
+    box_outs = excluded.box_outs,
+    box_outs_offensive = excluded.box_outs_offensive,
+    box_outs_defensive = excluded.box_outs_defensive
+"""
+
+# Only fills in defensive rows the advanced stats already wrote; a no-op otherwise
+UPDATE_DEFENSIVE_HUSTLE_SQL = """
+UPDATE fact_player_defensive SET
+    contested_shots = ?,
+    deflections = ?,
+    charges_drawn = ?,
+    loose_balls_recovered = ?
+WHERE player_game_id = ?
+"""
+
+# Detail table each stat statement writes, for the per-table counts in the load summary
+STAT_SQL_TABLES = {
+    UPSERT_SHOT_TRACKING_SQL: "fact_player_shot_tracking",
+    UPSERT_EFFICIENCY_SQL: "fact_player_efficiency",
+    UPSERT_DEFENSIVE_RATING_SQL: "fact_player_defensive",
+    UPDATE_DEFENSIVE_HUSTLE_SQL: "fact_player_defensive",
+    UPSERT_PLAYMAKING_PCT_SQL: "fact_player_playmaking",
+    UPSERT_PLAYMAKING_TRACKING_SQL: "fact_player_playmaking",
+    UPSERT_HUSTLE_TRACKING_SQL: "fact_player_hustle",
+    UPSERT_HUSTLE_SQL: "fact_player_hustle",
+}
 
 class NBADataWarehouse:
     """Class to manage the NBA data warehouse ETL process"""
@@ -56,20 +427,66 @@ class NBADataWarehouse:
         self.cursor = None
         self.team_id_map = {}
         self.player_id_map = {}
+        self.in_progress_game_ids = set()
+        self._known_date_ids = set()
+        # Raw box score archives are written here so the game loop doesn't wait on disk
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="raw_io")
+        self._raw_writes = []
     
     def connect_to_db(self):
         """Connect to the SQLite database"""
         try:
-            self.conn = sqlite3.connect(DATABASE_PATH)
+            # Autocommit mode; load stages open their own transactions with _transaction()
+            self.conn = sqlite3.connect(
+                DATABASE_PATH, isolation_level=None, cached_statements=DB_CACHED_STATEMENTS
+            )
+            self.conn.executescript(DB_PRAGMAS)
             self.cursor = self.conn.cursor()
+            self._load_lookup_caches()
             logger.info("Connected to database")
             return True
         except Exception as e:
             logger.error(f"Error connecting to database: {e}")
             return False
     
+    def _load_lookup_caches(self):
+        """Preload dimension keys so per-row lookups don't query the database"""
+        try:
+            self.cursor.execute("SELECT date_id FROM dim_dates")
+            self._known_date_ids = {row[0] for row in self.cursor.fetchall()}
+            self.cursor.execute("SELECT team_abbreviation, team_id FROM dim_teams")
+            self.team_id_map = dict(self.cursor.fetchall())
+        except sqlite3.OperationalError:
+            # Tables not created yet; ensure_tables_exist creates them empty
+            self._known_date_ids = set()
+    
+    @contextmanager
+    def _transaction(self):
+        """Run the block in a BEGIN IMMEDIATE transaction, rolling back on error"""
+        # IMMEDIATE takes the write lock up front instead of upgrading mid-transaction
+        self.cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            if self.conn.in_transaction:
+                self.cursor.execute("ROLLBACK")
+            # Drop cached keys for rows that were just rolled back
+            self._load_lookup_caches()
+            raise
+        self.cursor.execute("COMMIT")
+    
+    def _flush_raw_writes(self):
+        """Wait for queued raw data writes and log any that failed"""
+        for future in self._raw_writes:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error saving raw data: {e}")
+        self._raw_writes = []
+    
     def close_db(self):
         """Close the database connection"""
+        self._flush_raw_writes()
         if self.conn:
             self.conn.close()
             logger.info("Database connection closed")
@@ -324,25 +741,25 @@ class NBADataWarehouse:
             """
         }
         
-        tables_missing = []
-        
-        # Check which tables exist
-        for table in tables_to_check:
-            self.cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'")
-            if not self.cursor.fetchone():
-                tables_missing.append(table)
+        # Check which tables exist with a single catalog query
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        existing_tables = {row[0] for row in self.cursor.fetchall()}
+        tables_missing = [table for table in tables_to_check if table not in existing_tables]
         
-        # Create missing tables
-        for table in tables_missing:
-            if table in tables_to_create:
-                try:
-                    self.cursor.execute(tables_to_create[table])
-                    logger.info(f"Created table: {table}")
-                except Exception as e:
-                    logger.error(f"Error creating table {table}: {e}")
-                    return False
-        
-        self.conn.commit()
+        # Create missing tables and indexes in one transaction
+        with self._transaction():
+            for table in tables_missing:
+                if table in tables_to_create:
+                    try:
+                        self.cursor.execute(tables_to_create[table])
+                        logger.info(f"Created table: {table}")
+                    except Exception as e:
+                        logger.error(f"Error creating table {table}: {e}")
+                        return False
+            
+            # Create foreign key indexes
+            for ddl in WAREHOUSE_INDEXES:
+                self.cursor.execute(ddl)
         
         if tables_missing:
             logger.info(f"Created {len(tables_missing)} missing tables: {', '.join(tables_missing)}")
@@ -351,20 +768,44 @@ class NBADataWarehouse:
         
         return True
     
-    def _save_raw_data(self, data, data_type):
-        """Save raw API data to file"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{data_type}_{timestamp}.json"
+    def analyze_db(self):
+        """Refresh query planner statistics after a bulk load"""
+        try:
+            self.conn.execute("ANALYZE")
+            logger.info("Database statistics updated")
+        except sqlite3.Error as e:
+            logger.warning(f"Error analyzing database: {e}")
+    
+    def _save_raw_data(self, data, data_type, timestamped=True):
+        """Save raw API data to file as gzip-compressed compact JSON"""
+        if timestamped:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{data_type}_{timestamp}.json.gz"
+        else:
+            filename = f"{data_type}.json.gz"
         filepath = os.path.join(RAW_DATA_DIR, filename)
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Untimestamped snapshots (e.g. a game's box score) are written once and kept
+        if not timestamped and os.path.exists(filepath):
+            logger.debug("Raw data already saved to %s", filepath)
+            return filepath
+        
+        # Raw response text from the API is already JSON and is written as-is
+        if isinstance(data, str):
+            payload = data.encode('utf-8')
+        elif orjson is not None:
+            payload = orjson.dumps(data)
+        else:
+            payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        
+        with gzip.open(filepath, 'wb', compresslevel=RAW_COMPRESS_LEVEL) as f:
+            f.write(payload)
         
         logger.info(f"Raw data saved to {filepath}")
         return filepath
     
-    def _ensure_date_exists(self, date_str):
-        """Ensure date exists in dim_dates table"""
+    def _ensure_date_exists(self, date_str, now=None):
+        """Ensure date exists in dim_dates table, stamping new rows with now"""
         if not date_str:
             return None
             
@@ -379,37 +820,19 @@ class NBADataWarehouse:
             # Create date_id (YYYYMMDD format)
             date_id = date_str.replace('-', '')
             
-            # Check if date already exists
-            self.cursor.execute("SELECT 1 FROM dim_dates WHERE date_id = ?", (date_id,))
-            if not self.cursor.fetchone():
-                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # Only dates not seen on this connection reach the database
+            if date_id not in self._known_date_ids:
+                if now is None:
+                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 
                 # Insert date
-                self.cursor.execute("""
-                INSERT INTO dim_dates (
-                    date_id, full_date, day_of_week, day_name,
-                    day_of_month, day_of_year, week_of_year,
-                    month_num, month_name, quarter, year,
-                    is_weekend, inserted_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    date_id,
-                    date_str,
-                    date_obj.weekday(),
-                    date_obj.strftime("%A"),
-                    date_obj.day,
-                    date_obj.timetuple().tm_yday,
-                    date_obj.isocalendar()[1],
-                    date_obj.month,
-                    date_obj.strftime("%B"),
-                    (date_obj.month - 1) // 3 + 1,
-                    date_obj.year,
-                    1 if date_obj.weekday() >= 5 else 0,  # 5 = Saturday, 6 = Sunday
-                    now
-                ))
+                self.cursor.execute(INSERT_DATE_SQL, self._date_row(date_id, date_str, date_obj, now))
                 
-                self.conn.commit()
-                logger.info(f"Added date {date_str} to dim_dates")
+                self._known_date_ids.add(date_id)
+                
+                # Committed by the caller's transaction
+                if self.cursor.rowcount:
+                    logger.debug("Added date %s to dim_dates", date_str)
             
             return date_id
             
@@ -417,13 +840,50 @@ class NBADataWarehouse:
             logger.error(f"Error ensuring date exists for {date_str}: {e}")
             return None
     
+    def _ensure_dates_exist(self, date_strs, now=None):
+        """Insert the dates missing from dim_dates in one batch, stamping them with now"""
+        if now is None:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        date_rows = []
+        
+        for date_str in sorted(date_strs):
+            date_id = date_str.replace('-', '')
+            if date_id not in self._known_date_ids:
+                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+                date_rows.append(self._date_row(date_id, date_str, date_obj, now))
+                self._known_date_ids.add(date_id)
+        
+        # Committed by the caller's transaction
+        self.cursor.executemany(INSERT_DATE_SQL, date_rows)
+        if self.cursor.rowcount > 0:
+            logger.info(f"Added {self.cursor.rowcount} dates to dim_dates")
+    
+    @staticmethod
+    def _date_row(date_id, date_str, date_obj, now):
+        """Build a dim_dates row for INSERT_DATE_SQL"""
+        return (
+            date_id,
+            date_str,
+            date_obj.weekday(),
+            date_obj.strftime("%A"),
+            date_obj.day,
+            date_obj.timetuple().tm_yday,
+            date_obj.isocalendar()[1],
+            date_obj.month,
+            date_obj.strftime("%B"),
+            (date_obj.month - 1) // 3 + 1,
+            date_obj.year,
+            1 if date_obj.weekday() >= 5 else 0,  # 5 = Saturday, 6 = Sunday
+            now
+        )
+    
     def load_teams(self):
         """Load teams into dim_teams table"""
         logger.info("Loading teams data...")
         
         try:
             # Get teams from API
-            nba_teams = teams.get_teams()
+            nba_teams = _static_teams()
             
             # Save raw data
             self._save_raw_data(nba_teams, "teams")
@@ -431,58 +891,33 @@ class NBADataWarehouse:
             # Load teams into database
             now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            teams_added = 0
-            teams_updated = 0
+            team_rows = [
+                (
+                    str(team['id']),
+                    team['nickname'],
+                    team['city'],
+                    team['abbreviation'],
+                    team.get('conference'),
+                    team.get('division'),
+                    now,
+                    now
+                )
+                for team in nba_teams
+            ]
             
-            for team in nba_teams:
-                team_id = str(team['id'])
-                
-                # Store in map for later use
-                self.team_id_map[team['abbreviation']] = team_id
-                
-                # Check if team already exists
-                self.cursor.execute("SELECT 1 FROM dim_teams WHERE team_id = ?", (team_id,))
-                if self.cursor.fetchone():
-                    # Update existing team
-                    self.cursor.execute("""
-                    UPDATE dim_teams SET
-                        team_name = ?,
-                        team_city = ?,
-                        team_abbreviation = ?,
-                        conference = ?,
-                        division = ?,
-                        updated_at = ?
-                    WHERE team_id = ?
-                    """, (
-                        team['nickname'],
-                        team['city'],
-                        team['abbreviation'],
-                        team.get('conference'),
-                        team.get('division'),
-                        now,
-                        team_id
-                    ))
-                    teams_updated += 1
-                else:
-                    # Insert new team
-                    self.cursor.execute("""
-                    INSERT INTO dim_teams (
-                        team_id, team_name, team_city, team_abbreviation,
-                        conference, division, inserted_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        team_id,
-                        team['nickname'],
-                        team['city'],
-                        team['abbreviation'],
-                        team.get('conference'),
-                        team.get('division'),
-                        now,
-                        now
-                    ))
-                    teams_added += 1
+            # Store in map for later use; each row's team_id was converted once above
+            self.team_id_map = {row[3]: row[0] for row in team_rows}
+            
+            # Existing IDs are only needed for the added/updated counts
+            self.cursor.execute("SELECT team_id FROM dim_teams")
+            existing_teams = {row[0] for row in self.cursor.fetchall()}
+            teams_updated = sum(1 for row in team_rows if row[0] in existing_teams)
+            teams_added = len(team_rows) - teams_updated
+            
+            # Write all teams in a single transaction
+            with self._transaction():
+                self.cursor.executemany(UPSERT_TEAM_SQL, team_rows)
             
-            self.conn.commit()
             logger.info(f"Teams loaded: {teams_added} added, {teams_updated} updated")
             return True
             
@@ -496,7 +931,7 @@ class NBADataWarehouse:
         
         try:
             # Get active players from API
-            active_players = players.get_active_players()
+            active_players = _static_active_players()
             
             # Save raw data
             self._save_raw_data(active_players, "active_players")
@@ -504,48 +939,24 @@ class NBADataWarehouse:
             # Load players into database
             now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            players_added = 0
-            players_updated = 0
+            player_rows = [
+                (str(player['id']), player['first_name'], player['last_name'], now, now)
+                for player in active_players
+            ]
             
-            for player in active_players:
-                player_id = str(player['id'])
-                
-                # Store in map for later use
-                self.player_id_map[player_id] = player_id
-                
-                # Check if player already exists
-                self.cursor.execute("SELECT 1 FROM dim_players WHERE player_id = ?", (player_id,))
-                if self.cursor.fetchone():
-                    # Update existing player
-                    self.cursor.execute("""
-                    UPDATE dim_players SET
-                        first_name = ?,
-                        last_name = ?,
-                        updated_at = ?
-                    WHERE player_id = ?
-                    """, (
-                        player['first_name'],
-                        player['last_name'],
-                        now,
-                        player_id
-                    ))
-                    players_updated += 1
-                else:
-                    # Insert new player
-                    self.cursor.execute("""
-                    INSERT INTO dim_players (
-                        player_id, first_name, last_name, inserted_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?)
-                    """, (
-                        player_id,
-                        player['first_name'],
-                        player['last_name'],
-                        now,
-                        now
-                    ))
-                    players_added += 1
+            # Store in map for later use
+            self.player_id_map.update({row[0]: row[0] for row in player_rows})
+            
+            # Existing IDs are only needed for the added/updated counts
+            self.cursor.execute("SELECT player_id FROM dim_players")
+            existing_players = {row[0] for row in self.cursor.fetchall()}
+            players_updated = sum(1 for row in player_rows if row[0] in existing_players)
+            players_added = len(player_rows) - players_updated
+            
+            # Write all players in a single transaction
+            with self._transaction():
+                self.cursor.executemany(UPSERT_PLAYER_SQL, player_rows)
             
-            self.conn.commit()
             logger.info(f"Players loaded: {players_added} added, {players_updated} updated")
             return True
             
@@ -570,163 +981,152 @@ class NBADataWarehouse:
                 date_from_nullable=date_from,
                 league_id_nullable='00'  # NBA
             )
-            games_dict = game_finder.get_dict()
+            # Parse the response text once and archive that same text
+            games_response = game_finder.get_response()
+            games_dict = json_loads(games_response)
             
             # Save raw data
-            self._save_raw_data(games_dict, "recent_games")
+            self._save_raw_data(games_response, "recent_games")
             
             # Process game data
             games_added = 0
             games_updated = 0
+            games_unchanged = 0
             game_stats_added = 0
             game_stats_updated = 0
+            game_stats_unchanged = 0
             
             if 'resultSets' in games_dict and len(games_dict['resultSets']) > 0:
                 result_set = games_dict['resultSets'][0]
                 headers = result_set['headers']
                 rows = result_set['rowSet']
                 
-                # Create DataFrame for easier processing
-                df = pd.DataFrame(rows, columns=headers)
+                game_id_idx = headers.index('GAME_ID')
+                team_id_idx = headers.index('TEAM_ID')
+                team_abbr_idx = headers.index('TEAM_ABBREVIATION')
+                game_date_idx = headers.index('GAME_DATE')
+                season_idx = headers.index('SEASON_ID')
+                pts_idx = headers.index('PTS')
+                wl_idx = headers.index('WL')
                 
-                # Group games by GAME_ID
-                game_groups = df.groupby('GAME_ID')
+                # Games without a result yet are still being played; their box scores are reloaded
+                self.in_progress_game_ids = {row[game_id_idx] for row in rows if row[wl_idx] is None}
                 
-                # Process each game
-                for game_id, game_df in game_groups:
-                    # Get game info from first row
-                    game_info = game_df.iloc[0]
-                    game_date = game_info['GAME_DATE']
-                    season = game_info['SEASON_ID']
-                    
-                    # Ensure date exists in dim_dates
-                    date_id = self._ensure_date_exists(game_date)
-                    
-                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    
-                    # Check if game already exists
-                    self.cursor.execute("SELECT 1 FROM dim_games WHERE game_id = ?", (game_id,))
-                    if self.cursor.fetchone():
-                        # Update existing game
-                        self.cursor.execute("""
-                        UPDATE dim_games SET
-                            game_date = ?,
-                            season = ?,
-                            updated_at = ?
-                        WHERE game_id = ?
-                        """, (
-                            game_date,
-                            season,
-                            now,
-                            game_id
-                        ))
-                        games_updated += 1
-                    else:
-                        # Insert new game
-                        self.cursor.execute("""
-                        INSERT INTO dim_games (
-                            game_id, game_date, season, season_type, inserted_at, updated_at
-                        ) VALUES (?, ?, ?, ?, ?, ?)
-                        """, (
-                            game_id,
-                            game_date,
-                            season,
-                            'Regular Season',  # Simplified - would need logic for playoffs
-                            now,
-                            now
-                        ))
-                        games_added += 1
+                # Bucket the rowSet by game, keeping each team's first row in API order.
+                # Team ids come from the abbreviation map built by load_teams, falling
+                # back to the API's TEAM_ID.
+                rows_by_game = {}
+                for row in rows:
+                    team_id = self.team_id_map.get(row[team_abbr_idx]) or str(row[team_id_idx])
+                    rows_by_game.setdefault(row[game_id_idx], {}).setdefault(team_id, row)
+                
+                # One entry per game: date and season from its first row, then its teams and scores
+                game_summary = []
+                for game_id in sorted(rows_by_game):
+                    team_rows = rows_by_game[game_id]
+                    first_row = next(iter(team_rows.values()))
+                    game_summary.append((
+                        game_id,
+                        first_row[game_date_idx],
+                        first_row[season_idx],
+                        list(team_rows),
+                        [row[pts_idx] for row in team_rows.values()]
+                    ))
+                
+                # Current warehouse rows for these games, so unchanged games are not rewritten
+                game_ids_json = json.dumps([summary[0] for summary in game_summary])
+                self.cursor.execute(
+                    "SELECT game_id, game_date, season FROM dim_games WHERE game_id IN (SELECT value FROM json_each(?))",
+                    (game_ids_json,)
+                )
+                existing_games = {row[0]: tuple(row[1:]) for row in self.cursor.fetchall()}
+                
+                # Older warehouses were created without fact_game_stats.date_id
+                self.cursor.execute("PRAGMA table_info(fact_game_stats)")
+                game_stats_has_date_id = 'date_id' in {row[1] for row in self.cursor.fetchall()}
+                game_stats_columns = "home_team_id, away_team_id, home_team_score, away_team_score"
+                if game_stats_has_date_id:
+                    game_stats_columns = "date_id, " + game_stats_columns
+                else:
+                    logger.warning("Column mismatch in fact_game_stats: no date_id column, loading game stats without it")
+                
+                self.cursor.execute(
+                    f"SELECT game_id, {game_stats_columns} FROM fact_game_stats "
+                    "WHERE game_id IN (SELECT value FROM json_each(?))",
+                    (game_ids_json,)
+                )
+                existing_game_stats = {row[0]: tuple(row[1:]) for row in self.cursor.fetchall()}
+                
+                # Collect new and changed rows per table, then upsert each table in one batch
+                dim_games_rows = []
+                fact_game_rows = []
+                
+                # One timestamp for the whole stage
+                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                
+                # Process each game in a single transaction; rolls back on error
+                with self._transaction():
+                    # Every date in the fetch window, plus any game dates outside it, in one batch
+                    window_dates = {
+                        (start_date + timedelta(days=offset)).strftime("%Y-%m-%d")
+                        for offset in range(days_back + 1)
+                    }
+                    self._ensure_dates_exist(window_dates | {summary[1] for summary in game_summary}, now)
                     
-                    # Now process game stats if we have at least 2 teams
-                    unique_teams = game_df['TEAM_ID'].unique()
-                    if len(unique_teams) >= 2:
-                        # For simplicity, assume first team is home, second is away
-                        # In production, you'd want more robust logic
-                        home_team_id = str(unique_teams[0])
-                        away_team_id = str(unique_teams[1])
+                    for game_id, game_date, season, team_ids, team_scores in game_summary:
+                        date_id = game_date.replace('-', '')
                         
-                        # Get team data
-                        home_team_df = game_df[game_df['TEAM_ID'] == int(home_team_id)]
-                        away_team_df = game_df[game_df['TEAM_ID'] == int(away_team_id)]
+                        # Write new games and only the existing ones whose data changed
+                        if existing_games.get(game_id) == (game_date, season):
+                            games_unchanged += 1
+                        else:
+                            if game_id in existing_games:
+                                games_updated += 1
+                            else:
+                                games_added += 1
+                            dim_games_rows.append((
+                                game_id,
+                                game_date,
+                                season,
+                                'Regular Season',  # Simplified - would need logic for playoffs
+                                now,
+                                now
+                            ))
                         
-                        if not home_team_df.empty and not away_team_df.empty:
-                            home_score = home_team_df['PTS'].iloc[0]
-                            away_score = away_team_df['PTS'].iloc[0]
+                        # Now process game stats if we have at least 2 teams
+                        if len(team_ids) >= 2:
+                            # For simplicity, assume first team is home, second is away
+                            # In production, you'd want more robust logic
+                            home_team_id = team_ids[0]
+                            away_team_id = team_ids[1]
+                            home_score = team_scores[0]
+                            away_score = team_scores[1]
                             
-                            # Check if game stats already exist
-                            self.cursor.execute("SELECT 1 FROM fact_game_stats WHERE game_id = ?", (game_id,))
-                            if self.cursor.fetchone():
-                                # Update existing game stats
-                                try:
-                                    self.cursor.execute("""
-                                    UPDATE fact_game_stats SET
-                                        date_id = ?,
-                                        home_team_id = ?,
-                                        away_team_id = ?,
-                                        home_team_score = ?,
-                                        away_team_score = ?,
-                                        inserted_at = ?
-                                    WHERE game_id = ?
-                                    """, (
-                                        date_id,
-                                        home_team_id,
-                                        away_team_id,
-                                        home_score,
-                                        away_score,
-                                        now,
-                                        game_id
-                                    ))
-                                    game_stats_updated += 1
-                                except sqlite3.OperationalError as e:
-                                    # Handle case where columns might be different
-                                    logger.warning(f"Column mismatch in fact_game_stats: {e}")
-                                    
-                                    # Try simplified update
-                                    self.cursor.execute("""
-                                    UPDATE fact_game_stats SET
-                                        home_team_id = ?,
-                                        away_team_id = ?,
-                                        home_team_score = ?,
-                                        away_team_score = ?,
-                                        inserted_at = ?
-                                    WHERE game_id = ?
-                                    """, (
-                                        home_team_id,
-                                        away_team_id,
-                                        home_score,
-                                        away_score,
-                                        now,
-                                        game_id
-                                    ))
-                                    game_stats_updated += 1
+                            game_stats = (home_team_id, away_team_id, home_score, away_score)
+                            if game_stats_has_date_id:
+                                game_stats = (date_id,) + game_stats
+                            
+                            if existing_game_stats.get(game_id) == game_stats:
+                                game_stats_unchanged += 1
                             else:
-                                # Insert new game stats
-                                try:
-                                    self.cursor.execute("""
-                                    INSERT INTO fact_game_stats (
-                                        game_id, date_id, home_team_id, away_team_id,
-                                        home_team_score, away_team_score, inserted_at
-                                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                                    """, (
-                                        game_id,
-                                        date_id,
-                                        home_team_id,
-                                        away_team_id,
-                                        home_score,
-                                        away_score,
-                                        now
-                                    ))
+                                if game_id in existing_game_stats:
+                                    game_stats_updated += 1
+                                else:
                                     game_stats_added += 1
-                                except sqlite3.OperationalError as e:
-                                    # Handle case where columns might be different
-                                    logger.warning(f"Column mismatch in fact_game_stats: {e}")
+                                fact_game_rows.append((game_id,) + game_stats + (now,))
+                    
+                    # Upsert each table in one batch
+                    self.cursor.executemany(UPSERT_GAME_SQL, dim_games_rows)
+                    self.cursor.executemany(
+                        UPSERT_GAME_STATS_SQL if game_stats_has_date_id else UPSERT_GAME_STATS_NO_DATE_SQL,
+                        fact_game_rows
+                    )
                 
-                self.conn.commit()
-                logger.info(f"Games loaded: {games_added} added, {games_updated} updated")
-                logger.info(f"Game stats loaded: {game_stats_added} added, {game_stats_updated} updated")
+                logger.info(f"Games loaded: {games_added} added, {games_updated} updated, {games_unchanged} unchanged")
+                logger.info(f"Game stats loaded: {game_stats_added} added, {game_stats_updated} updated, {game_stats_unchanged} unchanged")
                 
                 # Return list of game IDs for player stats processing
-                unique_game_ids = list(game_groups.groups.keys())
+                unique_game_ids = [summary[0] for summary in game_summary]
                 return unique_game_ids
             
             else:
@@ -738,730 +1138,501 @@ class NBADataWarehouse:
             return []
     
     def load_player_game_stats(self, game_ids, limit=5):
-        """Load player game stats for the specified games"""
+        """Load player game stats for the specified games, at most limit of them (None for all)"""
         if not game_ids:
             logger.info("No games to process player stats for")
             return False
         
+        # Skip finished games whose player stats are already loaded
+        self.cursor.execute(
+            "SELECT DISTINCT game_id FROM fact_player_game_stats WHERE game_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(game_ids)),)
+        )
+        loaded_game_ids = {row[0] for row in self.cursor.fetchall()} - self.in_progress_game_ids
+        if loaded_game_ids:
+            logger.info(f"Skipping {len(loaded_game_ids)} games with player stats already loaded")
+            game_ids = [game_id for game_id in game_ids if game_id not in loaded_game_ids]
+            if not game_ids:
+                return True
+        
         # Limit the number of games to process
         game_ids_to_process = game_ids[:limit]
         logger.info(f"Loading player stats for {len(game_ids_to_process)} games...")
         
         players_added = 0
         player_stats_added = 0
-        shot_tracking_added = 0
-        defensive_stats_added = 0
-        efficiency_stats_added = 0
-        hustle_stats_added = 0
-        playmaking_stats_added = 0
+        # Row writes per detail table; a player-game written by two statements counts twice
+        detail_rows_written = Counter()
+        
+        # Check the fact_player_game_stats schema once for the whole run
+        self.cursor.execute("PRAGMA table_info(fact_player_game_stats)")
+        player_cols = {row[1] for row in self.cursor.fetchall()}
+        missing_player_cols = [col for col in PLAYER_GAME_STATS_COLUMNS if col not in player_cols]
+        has_all_player_stat_cols = not missing_player_cols
+        if missing_player_cols:
+            logger.warning(f"Schema mismatch in fact_player_game_stats: missing columns {', '.join(missing_player_cols)}; "
+                           "skipping player game stats")
         
-        for game_id in game_ids_to_process:
-            logger.info(f"Processing player stats for game {game_id}...")
+        # Load known player IDs once instead of querying dim_players per row
+        self.cursor.execute("SELECT player_id FROM dim_players")
+        existing_players = {row[0] for row in self.cursor.fetchall()}
+        
+        # Load the game dates for every game up front instead of one query per game
+        self.cursor.execute(
+            "SELECT game_id, game_date FROM dim_games WHERE game_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(game_ids_to_process),)
+        )
+        game_dates = dict(self.cursor.fetchall())
+        
+        # Save the DDL of every secondary index (sql is NULL for PRIMARY KEY
+        # autoindexes) so it can be replayed after the load, even if it fails.
+        # A killed process gets the WAREHOUSE_INDEXES back from ensure_tables_exist.
+        deferred_indexes = []
+        if len(game_ids_to_process) >= BULK_LOAD_MIN_GAMES:
+            self.cursor.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+                "AND tbl_name IN (SELECT value FROM json_each(?))",
+                (json.dumps(PLAYER_STATS_TABLES),)
+            )
+            deferred_indexes = self.cursor.fetchall()
+            with self._transaction():
+                for index_name, _ in deferred_indexes:
+                    self.cursor.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+            logger.info(f"Dropped {len(deferred_indexes)} player stats indexes for bulk load: "
+                        f"{', '.join(name for name, _ in deferred_indexes)}")
+        
+        try:
+            # One timestamp for the whole stage
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            try:
-                # Get box score
-                box_score = boxscoretraditionalv2.BoxScoreTraditionalV2(game_id=game_id)
-                box_score_dict = box_score.get_dict()
+            # Box scores download in the background; database writes stay on this thread
+            for game_id, box_score_future in self._fetch_box_scores(game_ids_to_process):
+                logger.info(f"Processing player stats for game {game_id}...")
                 
-                # Save raw data
-                self._save_raw_data(box_score_dict, f"boxscore_{game_id}")
-                
-                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                # Get game date for date_id
-                self.cursor.execute("SELECT game_date FROM dim_games WHERE game_id = ?", (game_id,))
-                result = self.cursor.fetchone()
-                game_date = result[0] if result else None
-                date_id = self._ensure_date_exists(game_date)
-                
-                # Process player stats
-                if 'resultSets' in box_score_dict:
-                    for result_set in box_score_dict['resultSets']:
-                        if result_set['name'] == 'PlayerStats':
-                            headers = result_set['headers']
-                            rows = result_set['rowSet']
-                            
-                            # Create DataFrame
-                            player_df = pd.DataFrame(rows, columns=headers)
-                            
-                            # Process each player
-                            for _, player_row in player_df.iterrows():
-                                player_id = str(player_row['PLAYER_ID'])
-                                player_name = player_row['PLAYER_NAME']
-                                team_id = str(player_row['TEAM_ID'])
+                try:
+                    # Get box score
+                    box_score_response, box_score_dict = box_score_future.result()
+                    
+                    # Save raw data in the background
+                    self._raw_writes.append(self._io_pool.submit(
+                        self._save_raw_data, box_score_response, f"boxscore_{game_id}", timestamped=False
+                    ))
+                    
+                    # Get game date for date_id
+                    game_date = game_dates.get(game_id)
+                    date_id = game_date.replace('-', '') if game_date else None
+                    
+                    # Parse the box score before opening the transaction, so the
+                    # write lock is only held while this game's rows are written
+                    new_player_rows = []
+                    new_player_ids = set()
+                    player_stats_rows = []
+                    player_games = []
+                    
+                    if 'resultSets' in box_score_dict:
+                        for result_set in box_score_dict['resultSets']:
+                            if result_set['name'] == 'PlayerStats':
+                                # Resolve column positions once and read the rowSet directly,
+                                # rather than building a DataFrame per box score
+                                columns = {header: i for i, header in enumerate(result_set['headers'])}
+                                player_idx = columns['PLAYER_ID']
+                                name_idx = columns['PLAYER_NAME']
+                                team_idx = columns['TEAM_ID']
+                                get_stats = itemgetter(*(columns[field] for field in BOX_SCORE_STAT_FIELDS))
                                 
-                                # Check if player exists in dim_players
-                                self.cursor.execute("SELECT 1 FROM dim_players WHERE player_id = ?", (player_id,))
-                                if not self.cursor.fetchone():
-                                    # Split name into first and last
-                                    name_parts = player_name.split(" ", 1)
-                                    first_name = name_parts[0]
-                                    last_name = name_parts[1] if len(name_parts) > 1 else ""
+                                for row in result_set['rowSet']:
+                                    api_player_id = row[player_idx]
+                                    player_id = str(api_player_id)
+                                    team_id = str(row[team_idx])
+                                    stats = get_stats(row)
                                     
-                                    # Insert player
-                                    self.cursor.execute("""
-                                    INSERT INTO dim_players (
-                                        player_id, first_name, last_name, inserted_at, updated_at
-                                    ) VALUES (?, ?, ?, ?, ?)
-                                    """, (
-                                        player_id,
-                                        first_name,
-                                        last_name,
-                                        now,
-                                        now
-                                    ))
-                                    players_added += 1
-                                
-                                # Create player_game_id
-                                player_game_id = f"{game_id}_{player_id}"
-                                
-                                # Insert basic player game stats
-                                try:
-                                    self.cursor.execute("""
-                                    INSERT OR REPLACE INTO fact_player_game_stats (
-                                        player_game_id, game_id, player_id, team_id, date_id,
-                                        minutes_played, points, assists, rebounds, steals, blocks, turnovers,
-                                        personal_fouls, fg_made, fg_attempted, fg_pct, fg3_made, fg3_attempted, fg3_pct,
-                                        ft_made, ft_attempted, ft_pct, plus_minus, inserted_at
-                                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                    """, (
-                                        player_game_id, game_id, player_id, team_id, date_id,
-                                        player_row['MIN'],
-                                        player_row['PTS'],
-                                        player_row['AST'],
-                                        player_row['REB'],
-                                        player_row['STL'],
-                                        player_row['BLK'],
-                                        player_row['TO'],
-                                        player_row['PF'],
-                                        player_row['FGM'],
-                                        player_row['FGA'],
-                                        player_row['FG_PCT'],
-                                        player_row['FG3M'],
-                                        player_row['FG3A'],
-                                        player_row['FG3_PCT'],
-                                        player_row['FTM'],
-                                        player_row['FTA'],
-                                        player_row['FT_PCT'],
-                                        player_row['PLUS_MINUS'],
-                                        now
-                                    ))
-                                    player_stats_added += 1
-                                except sqlite3.OperationalError as e:
-                                    # Handle case where columns might be different
-                                    logger.warning(f"Schema mismatch in fact_player_game_stats: {e}")
-                                    continue
-                                
-                                # Process advanced stats - we'll do this in separate methods
-                                # to keep the code more organized
-                                self._process_shot_tracking(player_game_id, game_id, player_id, team_id)
-                                self._process_advanced_stats(player_game_id, game_id, player_id, team_id)
-                                self._process_hustle_stats(player_game_id, game_id, player_id, team_id)
-                
-                # Add small delay to avoid API rate limiting
-                logger.info(f"Completed processing for game {game_id}. Waiting before next game...")
-                time.sleep(15)
-                
-            except Exception as e:
-                logger.error(f"Error processing player stats for game {game_id}: {e}")
-                continue
+                                    # Check if player exists in dim_players
+                                    if player_id not in existing_players and player_id not in new_player_ids:
+                                        first_name, _, last_name = row[name_idx].partition(' ')
+                                        new_player_rows.append((player_id, first_name, last_name, now, now))
+                                        new_player_ids.add(player_id)
+                                    
+                                    # Create player_game_id
+                                    player_game_id = f"{game_id}_{player_id}"
+                                    
+                                    player_stats_rows.append(
+                                        (player_game_id, game_id, player_id, team_id, date_id) + stats + (now,)
+                                    )
+                                    player_games.append((player_game_id, api_player_id, team_id))
+                    
+                    # Skip the player game stats if the table is missing columns;
+                    # the detail tables below are still loaded for these players
+                    if not has_all_player_stat_cols:
+                        player_stats_rows = []
+                    
+                    # Shot charts and the game's advanced, tracking and hustle box scores
+                    # download together on the pool before the transaction
+                    shot_charts, adv_data, tracking_data, hustle_data = [], None, None, None
+                    if player_games:
+                        shot_charts, adv_data, tracking_data, hustle_data = self._fetch_game_details(game_id, player_games)
+                    
+                    # Index the advanced, tracking and hustle stats by player once per game
+                    adv_records = self._player_stats_records(adv_data, 'PlayerStats')
+                    tracking_records = self._player_stats_records(tracking_data, 'PlayerTrackingStats')
+                    hustle_records = self._player_stats_records(hustle_data, 'PlayerHustleStats')
+                    
+                    # Collect the shot tracking, advanced and hustle rows per statement;
+                    # each statement's rows are written in one batch below
+                    stat_rows = defaultdict(list)
+                    for player_game_id, shot_chart_future in shot_charts:
+                        self._process_shot_tracking(player_game_id, shot_chart_future, now, stat_rows)
+                    
+                    # The API's native player id is passed through so the lookups
+                    # below compare ints without parsing strings per player
+                    for player_game_id, player_id, team_id in player_games:
+                        self._process_advanced_stats(
+                            player_game_id, adv_records.get(player_id), tracking_records.get(player_id), now, stat_rows
+                        )
+                    
+                    # Hustle stats go last: stat_rows keeps insertion order, so their
+                    # fact_player_defensive updates run after the rows written above
+                    for player_game_id, player_id, team_id in player_games:
+                        self._process_hustle_stats(player_game_id, hustle_records.get(player_id), now, stat_rows)
+                    
+                    # One transaction per box score; rolls back the game on error
+                    with self._transaction():
+                        self._ensure_date_exists(game_date, now)
+                        
+                        # Insert players missing from dim_players
+                        self.cursor.executemany(INSERT_PLAYER_SQL, new_player_rows)
+                        game_players_added = self.cursor.rowcount
+                        
+                        # Insert basic player game stats; SQLite prepares the statement
+                        # even for no rows, which fails on a legacy schema
+                        if player_stats_rows:
+                            self.cursor.executemany(INSERT_PLAYER_GAME_STATS_SQL, player_stats_rows)
+                        
+                        game_rows_written = Counter()
+                        for stat_sql, rows in stat_rows.items():
+                            try:
+                                self.cursor.executemany(stat_sql, rows)
+                                game_rows_written[STAT_SQL_TABLES[stat_sql]] += self.cursor.rowcount
+                            except sqlite3.OperationalError as e:
+                                # Locked or busy databases and I/O errors roll the game back
+                                # instead of dropping the table's rows
+                                if not _is_schema_mismatch(e):
+                                    raise
+                                logger.warning(f"Schema mismatch writing player stats: {e}")
+                            except sqlite3.Error:
+                                # Every stat statement is an idempotent upsert or update, so
+                                # replay the batch row by row and skip only the rows that fail
+                                for row in rows:
+                                    try:
+                                        self.cursor.execute(stat_sql, row)
+                                        game_rows_written[STAT_SQL_TABLES[stat_sql]] += self.cursor.rowcount
+                                    except sqlite3.OperationalError:
+                                        raise
+                                    except sqlite3.Error as e:
+                                        logger.warning(f"Skipping player stats row for game {game_id}: {e}")
+                    
+                    # Only count rows once the game's transaction has committed
+                    existing_players.update(new_player_ids)
+                    players_added += game_players_added
+                    player_stats_added += len(player_stats_rows)
+                    detail_rows_written.update(game_rows_written)
+                    
+                    # Requests are paced by _api_limiter, so the next game starts right away
+                    logger.info(f"Completed processing for game {game_id}")
+                    
+                except Exception as e:
+                    logger.error(f"Error processing player stats for game {game_id}: {e}")
+                    continue
+        finally:
+            if deferred_indexes:
+                with self._transaction():
+                    for _, ddl in deferred_indexes:
+                        self.cursor.execute(ddl)
+                logger.info(f"Rebuilt {len(deferred_indexes)} player stats indexes")
         
-        self.conn.commit()
         logger.info(f"Player stats processed: {player_stats_added} player game stats records added/updated")
         logger.info(f"Additional players added: {players_added}")
+        logger.info("Detail stats written: " + ", ".join(
+            f"{detail_rows_written[table]} {table}" for table in dict.fromkeys(STAT_SQL_TABLES.values())
+        ))
         
         return True
     
-    def _process_shot_tracking(self, player_game_id, game_id, player_id, team_id):
-        """Process shot tracking data for a player-game with retry logic"""
-        max_retries = 3
-        retry_delay = 5  # seconds
+    def _get_box_score(self, game_id):
+        """Fetch one traditional box score, returning its response text and parsed dict"""
+        # Wait for a rate limiter token before hitting the API
+        _api_limiter.acquire()
+        box_score = boxscoretraditionalv2.BoxScoreTraditionalV2(game_id=game_id)
+        self._evict_in_progress(game_id, box_score)
+        box_score_response = box_score.get_response()
+        return box_score_response, json_loads(box_score_response)
+    
+    def _evict_in_progress(self, game_id, endpoint):
+        """Keep a game's responses out of the HTTP cache while the game is still being played"""
+        if game_id in self.in_progress_game_ids:
+            evict_http_cache(endpoint.nba_response.get_url())
+    
+    def _fetch_box_scores(self, game_ids):
+        """Fetch box scores on a thread pool, yielding (game_id, future) as each completes"""
+        with ThreadPoolExecutor(max_workers=API_WORKERS) as executor:
+            futures = {executor.submit(self._get_box_score, game_id): game_id for game_id in game_ids}
+            for future in as_completed(futures):
+                yield futures[future], future
+    
+    def _get_shot_chart(self, player_game_id, game_id, player_id, team_id):
+        """Fetch one player's shot chart for a game with retry logic"""
+        max_retries = API_MAX_RETRIES
         
         for attempt in range(max_retries):
             try:
-                # Get shot chart data
+                _api_limiter.acquire()
                 shot_chart = shotchartdetail.ShotChartDetail(
                     team_id=team_id,
                     player_id=player_id,
                     game_id_nullable=game_id,
                     context_measure_simple='FGA'
                 )
-                shot_data = shot_chart.get_dict()
-                
-                # Save raw data (commented out to reduce disk usage)
-                # self._save_raw_data(shot_data, f"shot_chart_{player_game_id}")
-                
-                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                # Process shot data
-                shots_0_3ft = 0
-                shots_0_3ft_made = 0
-                shots_3_10ft = 0
-                shots_3_10ft_made = 0
-                shots_10_16ft = 0
-                shots_10_16ft_made = 0
-                shots_16ft_3pt = 0
-                shots_16ft_3pt_made = 0
-                corner_3 = 0
-                corner_3_made = 0
-                above_break_3 = 0
-                above_break_3_made = 0
-                dunk_attempted = 0
-                dunk_made = 0
-                
-                if 'resultSets' in shot_data and len(shot_data['resultSets']) > 0:
-                    result_set = shot_data['resultSets'][0]
-                    headers = result_set['headers']
-                    rows = result_set['rowSet']
-                    
-                    if rows:
-                        df = pd.DataFrame(rows, columns=headers)
-                        
-                        # Process by shot zone
-                        for _, shot in df.iterrows():
-                            shot_made = shot['SHOT_MADE_FLAG'] == 1
-                            
-                            # Process by shot zone
-                            if shot['SHOT_ZONE_BASIC'] == 'Restricted Area':
-                                shots_0_3ft += 1
-                                if shot_made:
-                                    shots_0_3ft_made += 1
-                            elif shot['SHOT_ZONE_BASIC'] == 'In The Paint (Non-RA)':
-                                shots_3_10ft += 1
-                                if shot_made:
-                                    shots_3_10ft_made += 1
-                            elif shot['SHOT_ZONE_BASIC'] == 'Mid-Range':
-                                if shot['SHOT_ZONE_RANGE'] == '8-16 ft.':
-                                    shots_10_16ft += 1
-                                    if shot_made:
-                                        shots_10_16ft_made += 1
-                                else:
-                                    shots_16ft_3pt += 1
-                                    if shot_made:
-                                        shots_16ft_3pt_made += 1
-                            elif shot['SHOT_ZONE_BASIC'] == 'Above the Break 3':
-                                above_break_3 += 1
-                                if shot_made:
-                                    above_break_3_made += 1
-                            elif shot['SHOT_ZONE_BASIC'] == 'Corner 3':
-                                corner_3 += 1
-                                if shot_made:
-                                    corner_3_made += 1
-                            
-                            # Check for dunks
-                            if 'DUNK' in shot.get('ACTION_TYPE', ''):
-                                dunk_attempted += 1
-                                if shot_made:
-                                    dunk_made += 1
-                
-                # Calculate percentages
-                shots_0_3ft_pct = shots_0_3ft_made / shots_0_3ft if shots_0_3ft > 0 else None
-                shots_3_10ft_pct = shots_3_10ft_made / shots_3_10ft if shots_3_10ft > 0 else None
-                shots_10_16ft_pct = shots_10_16ft_made / shots_10_16ft if shots_10_16ft > 0 else None
-                shots_16ft_3pt_pct = shots_16ft_3pt_made / shots_16ft_3pt if shots_16ft_3pt > 0 else None
-                corner_3_pct = corner_3_made / corner_3 if corner_3 > 0 else None
-                above_break_3_pct = above_break_3_made / above_break_3 if above_break_3 > 0 else None
-                
-                # Insert into fact_player_shot_tracking
-                try:
-                    # Check if record exists first
-                    self.cursor.execute("SELECT 1 FROM fact_player_shot_tracking WHERE player_game_id = ?", (player_game_id,))
-                    if self.cursor.fetchone():
-                        # Update existing record
-                        self.cursor.execute("""
-                        UPDATE fact_player_shot_tracking SET
-                            shots_made_0_3ft = ?, shots_attempted_0_3ft = ?, shots_pct_0_3ft = ?,
-                            shots_made_3_10ft = ?, shots_attempted_3_10ft = ?, shots_pct_3_10ft = ?,
-                            shots_made_10_16ft = ?, shots_attempted_10_16ft = ?, shots_pct_10_16ft = ?,
-                            shots_made_16ft_3pt = ?, shots_attempted_16ft_3pt = ?, shots_pct_16ft_3pt = ?,
-                            corner_3_made = ?, corner_3_attempted = ?, corner_3_pct = ?,
-                            above_break_3_made = ?, above_break_3_attempted = ?, above_break_3_pct = ?,
-                            dunk_made = ?, dunk_attempted = ?
-                        WHERE player_game_id = ?
-                        """, (
-                            shots_0_3ft_made, shots_0_3ft, shots_0_3ft_pct,
-                            shots_3_10ft_made, shots_3_10ft, shots_3_10ft_pct,
-                            shots_10_16ft_made, shots_10_16ft, shots_10_16ft_pct,
-                            shots_16ft_3pt_made, shots_16ft_3pt, shots_16ft_3pt_pct,
-                            corner_3_made, corner_3, corner_3_pct,
-                            above_break_3_made, above_break_3, above_break_3_pct,
-                            dunk_made, dunk_attempted,
-                            player_game_id
-                        ))
-                    else:
-                        # Insert new record
-                        self.cursor.execute("""
-                        INSERT INTO fact_player_shot_tracking (
-                            player_game_id, shots_made_0_3ft, shots_attempted_0_3ft, shots_pct_0_3ft,
-                            shots_made_3_10ft, shots_attempted_3_10ft, shots_pct_3_10ft,
-                            shots_made_10_16ft, shots_attempted_10_16ft, shots_pct_10_16ft,
-                            shots_made_16ft_3pt, shots_attempted_16ft_3pt, shots_pct_16ft_3pt,
-                            corner_3_made, corner_3_attempted, corner_3_pct,
-                            above_break_3_made, above_break_3_attempted, above_break_3_pct,
-                            dunk_made, dunk_attempted, inserted_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            player_game_id,
-                            shots_0_3ft_made, shots_0_3ft, shots_0_3ft_pct,
-                            shots_3_10ft_made, shots_3_10ft, shots_3_10ft_pct,
-                            shots_10_16ft_made, shots_10_16ft, shots_10_16ft_pct,
-                            shots_16ft_3pt_made, shots_16ft_3pt, shots_16ft_3pt_pct,
-                            corner_3_made, corner_3, corner_3_pct,
-                            above_break_3_made, above_break_3, above_break_3_pct,
-                            dunk_made, dunk_attempted, now
-                        ))
-                    
-                    logger.debug(f"Added shot tracking data for {player_game_id}")
-                    return True
-                    
-                except sqlite3.OperationalError as e:
-                    logger.warning(f"Schema mismatch in fact_player_shot_tracking: {e}")
-                    return False
-                    
-            except (ConnectionError, TimeoutError, ConnectionResetError, RemoteDisconnected) as e:
+                self._evict_in_progress(game_id, shot_chart)
+                return shot_chart.get_dict()
+            except API_RETRY_ERRORS as e:
                 if attempt < max_retries - 1:
                     logger.warning(f"Connection error for shot tracking {player_game_id} (attempt {attempt+1}/{max_retries}): {e}")
-                    time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
+                    time.sleep(_retry_backoff(attempt))
                 else:
                     logger.error(f"Failed to process shot tracking for {player_game_id} after {max_retries} attempts: {e}")
-                    return False
-            except Exception as e:
-                logger.error(f"Error processing shot data for {player_game_id}: {e}")
-                return False
+                    raise
     
-    def _process_advanced_stats(self, player_game_id, game_id, player_id, team_id):
-        """Process advanced stats for a player-game with retry logic"""
-        max_retries = 3
-        retry_delay = 5  # seconds
+    def _fetch_game_details(self, game_id, player_games):
+        """Fetch a game's per-player shot charts and its advanced, tracking and hustle box scores on a thread pool
+        
+        Returns ([(player_game_id, shot chart future)], advanced dict, tracking dict,
+        hustle dict) once every request has finished; any dict is None if its fetch failed.
+        """
+        with ThreadPoolExecutor(max_workers=API_WORKERS) as executor:
+            adv_future = executor.submit(self._get_game_stats, boxscoreadvancedv2.BoxScoreAdvancedV2, game_id)
+            tracking_future = executor.submit(self._get_game_stats, boxscoreplayertrackv2.BoxScorePlayerTrackV2, game_id)
+            hustle_future = executor.submit(self._get_game_stats, hustlestatsboxscore.HustleStatsBoxScore, game_id)
+            shot_charts = [
+                (player_game_id, executor.submit(self._get_shot_chart, player_game_id, game_id, player_id, team_id))
+                for player_game_id, player_id, team_id in player_games
+            ]
+        return shot_charts, adv_future.result(), tracking_future.result(), hustle_future.result()
+    
+    @staticmethod
+    def _player_stats_records(stats_data, result_set_name):
+        """Map PLAYER_ID to that player's row as a dict from a box score's named result set"""
+        if not stats_data or 'resultSets' not in stats_data:
+            return {}
+        for result_set in stats_data['resultSets']:
+            if result_set['name'] == result_set_name:
+                headers = result_set['headers']
+                player_idx = headers.index('PLAYER_ID')
+                return {row[player_idx]: dict(zip(headers, row)) for row in result_set['rowSet']}
+        return {}
+    
+    def _process_shot_tracking(self, player_game_id, shot_chart_future, now, stat_rows):
+        """Process shot tracking data for a player-game from its fetched shot chart
+        
+        The fact_player_shot_tracking row is appended to stat_rows under its upsert
+        statement; load_player_game_stats writes the game's rows in one batch.
+        """
+        try:
+            # Get shot chart data
+            shot_data = shot_chart_future.result()
+            
+            # Save raw data (commented out to reduce disk usage)
+            # self._save_raw_data(shot_data, f"shot_chart_{player_game_id}")
+            
+            # Process shot data: count attempts and makes per bucket in one pass
+            attempts = Counter()
+            makes = Counter()
+            
+            if 'resultSets' in shot_data and len(shot_data['resultSets']) > 0:
+                result_set = shot_data['resultSets'][0]
+                columns = {header: i for i, header in enumerate(result_set['headers'])}
+                made_idx = columns['SHOT_MADE_FLAG']
+                zone_idx = columns['SHOT_ZONE_BASIC']
+                range_idx = columns['SHOT_ZONE_RANGE']
+                action_idx = columns.get('ACTION_TYPE')
+                
+                for row in result_set['rowSet']:
+                    shot_made = row[made_idx] == 1
+                    
+                    # Process by shot zone
+                    zone_basic = row[zone_idx]
+                    if zone_basic == 'Mid-Range':
+                        bucket = '10_16ft' if row[range_idx] == '8-16 ft.' else '16ft_3pt'
+                    else:
+                        bucket = SHOT_ZONE_BUCKETS.get(zone_basic)
+                    if bucket is not None:
+                        attempts[bucket] += 1
+                        makes[bucket] += shot_made
+                    
+                    # Check for dunks
+                    if action_idx is not None and 'DUNK' in row[action_idx]:
+                        attempts['dunk'] += 1
+                        makes['dunk'] += shot_made
+            
+            # Queue for fact_player_shot_tracking; SQLite computes the percentages
+            counts = tuple(
+                count for bucket in SHOT_TRACKING_BUCKETS for count in (makes[bucket], attempts[bucket])
+            )
+            stat_rows[UPSERT_SHOT_TRACKING_SQL].append((player_game_id,) + counts + (now,))
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error processing shot data for {player_game_id}: {e}")
+            return False
+    
+    def _get_game_stats(self, endpoint, game_id):
+        """Fetch a per-game stats endpoint with retry logic, returning its dict or None"""
+        max_retries = API_MAX_RETRIES
         
         for attempt in range(max_retries):
             try:
-                # Get advanced box score
-                adv_box = boxscoreadvancedv2.BoxScoreAdvancedV2(game_id=game_id)
-                adv_data = adv_box.get_dict()
-                
-                # Add delay before next API call to avoid rate limiting
-                time.sleep(1)
-                
-                # Get player tracking
-                tracking = boxscoreplayertrackv2.BoxScorePlayerTrackV2(game_id=game_id)
-                tracking_data = tracking.get_dict()
-                
-                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                # Process advanced data
-                if 'resultSets' in adv_data:
-                    for result_set in adv_data['resultSets']:
-                        if result_set['name'] == 'PlayerStats':
-                            headers = result_set['headers']
-                            rows = result_set['rowSet']
-                            
-                            # Create DataFrame
-                            df = pd.DataFrame(rows, columns=headers)
-                            
-                            # Find player row
-                            player_row = df[df['PLAYER_ID'] == int(player_id)]
-                            if not player_row.empty:
-                                # Extract efficiency metrics - with error handling for missing columns
-                                try:
-                                    offensive_rating = player_row['OFF_RATING'].iloc[0] if 'OFF_RATING' in player_row.columns else None
-                                    defensive_rating = player_row['DEF_RATING'].iloc[0] if 'DEF_RATING' in player_row.columns else None
-                                    net_rating = player_row['NET_RATING'].iloc[0] if 'NET_RATING' in player_row.columns else None
-                                    effective_fg_pct = player_row['EFG_PCT'].iloc[0] if 'EFG_PCT' in player_row.columns else None
-                                    true_shooting_pct = player_row['TS_PCT'].iloc[0] if 'TS_PCT' in player_row.columns else None
-                                    offensive_rebound_pct = player_row['OREB_PCT'].iloc[0] if 'OREB_PCT' in player_row.columns else None
-                                    defensive_rebound_pct = player_row['DREB_PCT'].iloc[0] if 'DREB_PCT' in player_row.columns else None
-                                    total_rebound_pct = player_row['REB_PCT'].iloc[0] if 'REB_PCT' in player_row.columns else None
-                                    assist_pct = player_row['AST_PCT'].iloc[0] if 'AST_PCT' in player_row.columns else None
-                                    
-                                    # These fields may not exist - use safe accessor
-                                    steal_pct = player_row['STL_PCT'].iloc[0] if 'STL_PCT' in player_row.columns else None
-                                    block_pct = player_row['BLK_PCT'].iloc[0] if 'BLK_PCT' in player_row.columns else None
-                                    usage_pct = player_row['USG_PCT'].iloc[0] if 'USG_PCT' in player_row.columns else None
-                                except Exception as e:
-                                    logger.warning(f"Error extracting advanced metrics: {e}")
-                                    # Set defaults
-                                    offensive_rating = defensive_rating = net_rating = None
-                                    effective_fg_pct = true_shooting_pct = None
-                                    offensive_rebound_pct = defensive_rebound_pct = total_rebound_pct = None
-                                    assist_pct = steal_pct = block_pct = usage_pct = None
-                                
-                                # Insert into fact_player_efficiency
-                                try:
-                                    # Check if record exists
-                                    self.cursor.execute("SELECT 1 FROM fact_player_efficiency WHERE player_game_id = ?", (player_game_id,))
-                                    if self.cursor.fetchone():
-                                        # Update existing record
-                                        self.cursor.execute("""
-                                        UPDATE fact_player_efficiency SET
-                                            true_shooting_pct = ?, effective_fg_pct = ?,
-                                            offensive_rating = ?, offensive_rebound_pct = ?,
-                                            defensive_rebound_pct = ?, total_rebound_pct = ?,
-                                            net_rating = ?
-                                        WHERE player_game_id = ?
-                                        """, (
-                                            true_shooting_pct, effective_fg_pct,
-                                            offensive_rating, offensive_rebound_pct,
-                                            defensive_rebound_pct, total_rebound_pct,
-                                            net_rating, player_game_id
-                                        ))
-                                    else:
-                                        # Insert new record
-                                        self.cursor.execute("""
-                                        INSERT INTO fact_player_efficiency (
-                                            player_game_id, true_shooting_pct, effective_fg_pct,
-                                            offensive_rating, offensive_rebound_pct,
-                                            defensive_rebound_pct, total_rebound_pct,
-                                            net_rating, inserted_at
-                                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                        """, (
-                                            player_game_id, true_shooting_pct, effective_fg_pct,
-                                            offensive_rating, offensive_rebound_pct,
-                                            defensive_rebound_pct, total_rebound_pct,
-                                            net_rating, now
-                                        ))
-                                    
-                                    logger.debug(f"Added efficiency data for {player_game_id}")
-                                except sqlite3.OperationalError as e:
-                                    logger.warning(f"Schema mismatch in fact_player_efficiency: {e}")
-                                
-                                # Insert into fact_player_defensive - only if we have defensive stats
-                                if defensive_rating is not None or steal_pct is not None or block_pct is not None:
-                                    try:
-                                        # Check if record exists
-                                        self.cursor.execute("SELECT 1 FROM fact_player_defensive WHERE player_game_id = ?", (player_game_id,))
-                                        if self.cursor.fetchone():
-                                            # Update existing record
-                                            self.cursor.execute("""
-                                            UPDATE fact_player_defensive SET
-                                                defensive_rating = ?,
-                                                steal_pct = ?, block_pct = ?
-                                            WHERE player_game_id = ?
-                                            """, (
-                                                defensive_rating,
-                                                steal_pct, block_pct,
-                                                player_game_id
-                                            ))
-                                        else:
-                                            # Insert new record
-                                            self.cursor.execute("""
-                                            INSERT INTO fact_player_defensive (
-                                                player_game_id, defensive_rating,
-                                                steal_pct, block_pct,
-                                                inserted_at
-                                            ) VALUES (?, ?, ?, ?, ?)
-                                            """, (
-                                                player_game_id, defensive_rating,
-                                                steal_pct, block_pct,
-                                                now
-                                            ))
-                                        
-                                        logger.debug(f"Added defensive data for {player_game_id}")
-                                    except sqlite3.OperationalError as e:
-                                        logger.warning(f"Schema mismatch in fact_player_defensive: {e}")
-                                
-                                # Insert into fact_player_playmaking - only if we have playmaking stats
-                                if assist_pct is not None or usage_pct is not None:
-                                    try:
-                                        # Check if record exists
-                                        self.cursor.execute("SELECT 1 FROM fact_player_playmaking WHERE player_game_id = ?", (player_game_id,))
-                                        if self.cursor.fetchone():
-                                            # Update existing record
-                                            self.cursor.execute("""
-                                            UPDATE fact_player_playmaking SET
-                                                assist_pct = ?, usage_pct = ?
-                                            WHERE player_game_id = ?
-                                            """, (
-                                                assist_pct, usage_pct, player_game_id
-                                            ))
-                                        else:
-                                            # Insert new record
-                                            self.cursor.execute("""
-                                            INSERT INTO fact_player_playmaking (
-                                                player_game_id, assist_pct, usage_pct, inserted_at
-                                            ) VALUES (?, ?, ?, ?)
-                                            """, (
-                                                player_game_id, assist_pct, usage_pct, now
-                                            ))
-                                        
-                                        logger.debug(f"Added playmaking data for {player_game_id}")
-                                    except sqlite3.OperationalError as e:
-                                        logger.warning(f"Schema mismatch in fact_player_playmaking: {e}")
-                
-                # Process tracking data
-                if 'resultSets' in tracking_data:
-                    for result_set in tracking_data['resultSets']:
-                        if result_set['name'] == 'PlayerTrackingStats':
-                            headers = result_set['headers']
-                            rows = result_set['rowSet']
-                            
-                            # Create DataFrame
-                            df = pd.DataFrame(rows, columns=headers)
-                            
-                            # Find player row
-                            player_row = df[df['PLAYER_ID'] == int(player_id)]
-                            if not player_row.empty:
-                                # Extract tracking metrics with safe accessors
-                                try:
-                                    dist_miles = player_row['DIST_MILES'].iloc[0] if 'DIST_MILES' in player_row.columns else None
-                                    dist_miles_off = player_row['DIST_MILES_OFF'].iloc[0] if 'DIST_MILES_OFF' in player_row.columns else None
-                                    dist_miles_def = player_row['DIST_MILES_DEF'].iloc[0] if 'DIST_MILES_DEF' in player_row.columns else None
-                                    speed = player_row['AVG_SPEED'].iloc[0] if 'AVG_SPEED' in player_row.columns else None
-                                    speed_off = player_row['AVG_SPEED_OFF'].iloc[0] if 'AVG_SPEED_OFF' in player_row.columns else None
-                                    speed_def = player_row['AVG_SPEED_DEF'].iloc[0] if 'AVG_SPEED_DEF' in player_row.columns else None
-                                    
-                                    potential_assists = player_row['POTENTIAL_AST'].iloc[0] if 'POTENTIAL_AST' in player_row.columns else None
-                                    assist_points_created = player_row['AST_PTS_CREATED'].iloc[0] if 'AST_PTS_CREATED' in player_row.columns else None
-                                    passes_made = player_row['PASSES_MADE'].iloc[0] if 'PASSES_MADE' in player_row.columns else None
-                                    passes_received = player_row['PASSES_RECEIVED'].iloc[0] if 'PASSES_RECEIVED' in player_row.columns else None
-                                except Exception as e:
-                                    logger.warning(f"Error extracting tracking metrics: {e}")
-                                    dist_miles = dist_miles_off = dist_miles_def = None
-                                    speed = speed_off = speed_def = None
-                                    potential_assists = assist_points_created = None
-                                    passes_made = passes_received = None
-                                
-                                # Insert into fact_player_hustle
-                                if any(v is not None for v in [dist_miles, dist_miles_off, dist_miles_def, speed, speed_off, speed_def]):
-                                    try:
-                                        # Check if record exists
-                                        self.cursor.execute("SELECT 1 FROM fact_player_hustle WHERE player_game_id = ?", (player_game_id,))
-                                        if self.cursor.fetchone():
-                                            # Update existing record
-                                            self.cursor.execute("""
-                                            UPDATE fact_player_hustle SET
-                                                distance_miles = ?, distance_miles_offense = ?,
-                                                distance_miles_defense = ?, avg_speed_mph = ?, 
-                                                avg_speed_mph_offense = ?, avg_speed_mph_defense = ?
-                                            WHERE player_game_id = ?
-                                            """, (
-                                                dist_miles, dist_miles_off,
-                                                dist_miles_def, speed, speed_off,
-                                                speed_def, player_game_id
-                                            ))
-                                        else:
-                                            # Insert new record
-                                            self.cursor.execute("""
-                                            INSERT INTO fact_player_hustle (
-                                                player_game_id, distance_miles, distance_miles_offense,
-                                                distance_miles_defense, avg_speed_mph, avg_speed_mph_offense,
-                                                avg_speed_mph_defense, inserted_at
-                                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                                            """, (
-                                                player_game_id, dist_miles, dist_miles_off,
-                                                dist_miles_def, speed, speed_off,
-                                                speed_def, now
-                                            ))
-                                        
-                                        logger.debug(f"Added hustle data for {player_game_id}")
-                                    except sqlite3.OperationalError as e:
-                                        logger.warning(f"Schema mismatch in fact_player_hustle: {e}")
-                                
-                                # Update fact_player_playmaking with tracking data
-                                if any(v is not None for v in [potential_assists, assist_points_created, passes_made, passes_received]):
-                                    try:
-                                        # Check if record exists
-                                        self.cursor.execute("SELECT 1 FROM fact_player_playmaking WHERE player_game_id = ?", (player_game_id,))
-                                        if self.cursor.fetchone():
-                                            # Update existing record
-                                            self.cursor.execute("""
-                                            UPDATE fact_player_playmaking SET
-                                                potential_assists = ?,
-                                                assist_points_created = ?,
-                                                passes_made = ?,
-                                                passes_received = ?
-                                            WHERE player_game_id = ?
-                                            """, (
-                                                potential_assists,
-                                                assist_points_created,
-                                                passes_made,
-                                                passes_received,
-                                                player_game_id
-                                            ))
-                                        else:
-                                            # Insert new record with just these fields
-                                            self.cursor.execute("""
-                                            INSERT INTO fact_player_playmaking (
-                                                player_game_id, potential_assists,
-                                                assist_points_created, passes_made,
-                                                passes_received, inserted_at
-                                            ) VALUES (?, ?, ?, ?, ?, ?)
-                                            """, (
-                                                player_game_id, potential_assists,
-                                                assist_points_created, passes_made,
-                                                passes_received, now
-                                            ))
-                                        
-                                        logger.debug(f"Updated playmaking data for {player_game_id}")
-                                    except sqlite3.OperationalError as e:
-                                        logger.warning(f"Schema mismatch updating fact_player_playmaking: {e}")
-                
-                return True
-                
-            except (ConnectionError, TimeoutError, ConnectionResetError, RemoteDisconnected) as e:
+                _api_limiter.acquire()
+                game_stats = endpoint(game_id=game_id)
+                self._evict_in_progress(game_id, game_stats)
+                return game_stats.get_dict()
+            except API_RETRY_ERRORS as e:
                 if attempt < max_retries - 1:
-                    logger.warning(f"Connection error for advanced stats {player_game_id} (attempt {attempt+1}/{max_retries}): {e}")
-                    time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
+                    logger.warning(f"Connection error for {endpoint.__name__} {game_id} (attempt {attempt+1}/{max_retries}): {e}")
+                    time.sleep(_retry_backoff(attempt))
                 else:
-                    logger.error(f"Failed to process advanced stats for {player_game_id} after {max_retries} attempts: {e}")
-                    return False
+                    logger.error(f"Failed to fetch {endpoint.__name__} for {game_id} after {max_retries} attempts: {e}")
             except Exception as e:
-                logger.error(f"Error processing advanced stats for {player_game_id}: {e}")
-                return False
-        
-    def _process_hustle_stats(self, player_game_id, game_id, player_id, team_id):
-        """Process hustle stats for a player-game with retry logic"""
-        max_retries = 3
-        retry_delay = 5  # seconds
+                logger.error(f"Error fetching {endpoint.__name__} for {game_id}: {e}")
+                return None
+        return None
+    
+    def _process_advanced_stats(self, player_game_id, adv, tracking, now, stat_rows):
+        """Process a player-game's advanced and tracking stats from their box score rows
         
-        for attempt in range(max_retries):
-            try:
-                # Get hustle stats
-                hustle = hustlestatsboxscore.HustleStatsBoxScore(game_id=game_id)
-                hustle_data = hustle.get_dict()
+        adv and tracking are the player's rows as dicts, or None when the box
+        score has none. Rows are appended to stat_rows under their upsert
+        statements, like _process_shot_tracking.
+        """
+        try:
+            # Process advanced data
+            if adv is not None:
+                # Read the efficiency metrics straight from the JSON row, so they bind as
+                # plain ints and floats; STL_PCT and BLK_PCT are often missing
+                (offensive_rating, defensive_rating, net_rating, effective_fg_pct,
+                 true_shooting_pct, offensive_rebound_pct, defensive_rebound_pct,
+                 total_rebound_pct, assist_pct, steal_pct, block_pct,
+                 usage_pct) = map(adv.get, ADVANCED_STAT_FIELDS)
                 
-                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                # Queue for fact_player_efficiency
+                stat_rows[UPSERT_EFFICIENCY_SQL].append((
+                    player_game_id, true_shooting_pct, effective_fg_pct,
+                    offensive_rating, offensive_rebound_pct,
+                    defensive_rebound_pct, total_rebound_pct,
+                    net_rating, now
+                ))
                 
-                # Process hustle data
-                if 'resultSets' in hustle_data:
-                    for result_set in hustle_data['resultSets']:
-                        if result_set['name'] == 'PlayerHustleStats':
-                            headers = result_set['headers']
-                            rows = result_set['rowSet']
-                            
-                            # Create DataFrame
-                            df = pd.DataFrame(rows, columns=headers)
-                            
-                            # Find player row
-                            player_row = df[df['PLAYER_ID'] == int(player_id)]
-                            if not player_row.empty:
-                                # Extract hustle metrics with error handling
-                                try:
-                                    contested_shots_2pt = player_row['CONTESTED_SHOTS_2PT'].iloc[0] if 'CONTESTED_SHOTS_2PT' in player_row.columns else 0
-                                    contested_shots_3pt = player_row['CONTESTED_SHOTS_3PT'].iloc[0] if 'CONTESTED_SHOTS_3PT' in player_row.columns else 0
-                                    deflections = player_row['DEFLECTIONS'].iloc[0] if 'DEFLECTIONS' in player_row.columns else 0
-                                    loose_balls_recovered = player_row['LOOSE_BALLS_RECOVERED'].iloc[0] if 'LOOSE_BALLS_RECOVERED' in player_row.columns else 0
-                                    charges_drawn = player_row['CHARGES_DRAWN'].iloc[0] if 'CHARGES_DRAWN' in player_row.columns else 0
-                                    screen_assists = player_row['SCREEN_ASSISTS'].iloc[0] if 'SCREEN_ASSISTS' in player_row.columns else 0
-                                    screen_assist_points = player_row['SCREEN_AST_PTS'].iloc[0] if 'SCREEN_AST_PTS' in player_row.columns else 0
-                                    box_outs = player_row['BOX_OUTS'].iloc[0] if 'BOX_OUTS' in player_row.columns else 0
-                                    box_outs_off = player_row['BOX_OUTS_OFF'].iloc[0] if 'BOX_OUTS_OFF' in player_row.columns else 0
-                                    box_outs_def = player_row['BOX_OUTS_DEF'].iloc[0] if 'BOX_OUTS_DEF' in player_row.columns else 0
-                                except Exception as e:
-                                    logger.warning(f"Error extracting hustle metrics: {e}")
-                                    contested_shots_2pt = contested_shots_3pt = deflections = 0
-                                    loose_balls_recovered = charges_drawn = screen_assists = 0
-                                    screen_assist_points = box_outs = box_outs_off = box_outs_def = 0
-                                
-                                # Insert or update fact_player_hustle
-                                try:
-                                    # First check if the record exists
-                                    self.cursor.execute("SELECT 1 FROM fact_player_hustle WHERE player_game_id = ?", (player_game_id,))
-                                    if self.cursor.fetchone():
-                                        # Update existing record
-                                        self.cursor.execute("""
-                                        UPDATE fact_player_hustle SET
-                                            contested_shots_2pt = ?,
-                                            contested_shots_3pt = ?,
-                                            deflections = ?,
-                                            loose_balls_recovered = ?,
-                                            charges_drawn = ?,
-                                            screen_assists = ?,
-                                            screen_assist_points = ?,
-                                            box_outs = ?,
-                                            box_outs_offensive = ?,
-                                            box_outs_defensive = ?
-                                        WHERE player_game_id = ?
-                                        """, (
-                                            contested_shots_2pt,
-                                            contested_shots_3pt,
-                                            deflections,
-                                            loose_balls_recovered,
-                                            charges_drawn,
-                                            screen_assists,
-                                            screen_assist_points,
-                                            box_outs,
-                                            box_outs_off,
-                                            box_outs_def,
-                                            player_game_id
-                                        ))
-                                    else:
-                                        # Insert new record
-                                        self.cursor.execute("""
-                                        INSERT INTO fact_player_hustle (
-                                            player_game_id, 
-                                            contested_shots_2pt,
-                                            contested_shots_3pt,
-                                            deflections,
-                                            loose_balls_recovered,
-                                            charges_drawn,
-                                            screen_assists,
-                                            screen_assist_points,
-                                            box_outs,
-                                            box_outs_offensive,
-                                            box_outs_defensive,
-                                            inserted_at
-                                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                        """, (
-                                            player_game_id,
-                                            contested_shots_2pt,
-                                            contested_shots_3pt,
-                                            deflections,
-                                            loose_balls_recovered,
-                                            charges_drawn,
-                                            screen_assists,
-                                            screen_assist_points,
-                                            box_outs,
-                                            box_outs_off,
-                                            box_outs_def,
-                                            now
-                                        ))
-                                    
-                                    logger.debug(f"Added hustle data for {player_game_id}")
-                                except sqlite3.OperationalError as e:
-                                    logger.warning(f"Schema mismatch in fact_player_hustle: {e}")
-                                
-                                # Update fact_player_defensive if it exists
-                                contested_shots = contested_shots_2pt + contested_shots_3pt
-                                
-                                try:
-                                    self.cursor.execute("SELECT 1 FROM fact_player_defensive WHERE player_game_id = ?", (player_game_id,))
-                                    if self.cursor.fetchone():
-                                        self.cursor.execute("""
-                                        UPDATE fact_player_defensive SET
-                                            contested_shots = ?,
-                                            deflections = ?,
-                                            charges_drawn = ?,
-                                            loose_balls_recovered = ?
-                                        WHERE player_game_id = ?
-                                        """, (
-                                            contested_shots,
-                                            deflections,
-                                            charges_drawn,
-                                            loose_balls_recovered,
-                                            player_game_id
-                                        ))
-                                        
-                                        logger.debug(f"Updated defensive data for {player_game_id}")
-                                except sqlite3.OperationalError as e:
-                                    logger.warning(f"Schema mismatch updating fact_player_defensive: {e}")
+                # Queue for fact_player_defensive - only if we have defensive stats
+                if defensive_rating is not None or steal_pct is not None or block_pct is not None:
+                    stat_rows[UPSERT_DEFENSIVE_RATING_SQL].append((
+                        player_game_id, defensive_rating,
+                        steal_pct, block_pct,
+                        now
+                    ))
                 
-                # Successfully processed, return
-                return True
+                # Queue for fact_player_playmaking - only if we have playmaking stats
+                if assist_pct is not None or usage_pct is not None:
+                    stat_rows[UPSERT_PLAYMAKING_PCT_SQL].append((
+                        player_game_id, assist_pct, usage_pct, now
+                    ))
+            
+            # Process tracking data
+            if tracking is not None:
+                (dist_miles, dist_miles_off, dist_miles_def, speed, speed_off, speed_def,
+                 potential_assists, assist_points_created, passes_made,
+                 passes_received) = map(tracking.get, TRACKING_STAT_FIELDS)
                 
-            except (ConnectionError, TimeoutError, ConnectionResetError, RemoteDisconnected) as e:
-                if attempt < max_retries - 1:
-                    logger.warning(f"Connection error for {player_game_id} (attempt {attempt+1}/{max_retries}): {e}")
-                    time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
-                else:
-                    logger.error(f"Failed to process hustle stats for {player_game_id} after {max_retries} attempts: {e}")
-                    return False
-            except Exception as e:
-                logger.error(f"Error processing hustle stats for {player_game_id}: {e}")
-                return False
+                # Queue for fact_player_hustle
+                if any(v is not None for v in [dist_miles, dist_miles_off, dist_miles_def, speed, speed_off, speed_def]):
+                    stat_rows[UPSERT_HUSTLE_TRACKING_SQL].append((
+                        player_game_id, dist_miles, dist_miles_off,
+                        dist_miles_def, speed, speed_off,
+                        speed_def, now
+                    ))
+                
+                # Queue fact_player_playmaking tracking columns
+                if any(v is not None for v in [potential_assists, assist_points_created, passes_made, passes_received]):
+                    stat_rows[UPSERT_PLAYMAKING_TRACKING_SQL].append((
+                        player_game_id, potential_assists,
+                        assist_points_created, passes_made,
+                        passes_received, now
+                    ))
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error processing advanced stats for {player_game_id}: {e}")
+            return False
+    
+    def _process_hustle_stats(self, player_game_id, rec, now, stat_rows):
+        """Process hustle stats for a player-game from its row in the game's hustle box score
+        
+        rec is the player's row as a dict, or None when the box score has none.
+        The fact_player_hustle upsert and fact_player_defensive update rows are
+        appended to stat_rows, like _process_shot_tracking.
+        """
+        if rec is None:
+            return False
+        
+        try:
+            # Columns the API omits default to 0
+            contested_shots_2pt = rec.get('CONTESTED_SHOTS_2PT', 0)
+            contested_shots_3pt = rec.get('CONTESTED_SHOTS_3PT', 0)
+            deflections = rec.get('DEFLECTIONS', 0)
+            loose_balls_recovered = rec.get('LOOSE_BALLS_RECOVERED', 0)
+            charges_drawn = rec.get('CHARGES_DRAWN', 0)
+            screen_assists = rec.get('SCREEN_ASSISTS', 0)
+            screen_assist_points = rec.get('SCREEN_AST_PTS', 0)
+            box_outs = rec.get('BOX_OUTS', 0)
+            box_outs_off = rec.get('BOX_OUTS_OFF', 0)
+            box_outs_def = rec.get('BOX_OUTS_DEF', 0)
+            
+            # Queue for fact_player_hustle
+            stat_rows[UPSERT_HUSTLE_SQL].append((
+                player_game_id,
+                contested_shots_2pt,
+                contested_shots_3pt,
+                deflections,
+                loose_balls_recovered,
+                charges_drawn,
+                screen_assists,
+                screen_assist_points,
+                box_outs,
+                box_outs_off,
+                box_outs_def,
+                now
+            ))
+            
+            # Queue the fact_player_defensive update
+            contested_shots = contested_shots_2pt + contested_shots_3pt
+            stat_rows[UPDATE_DEFENSIVE_HUSTLE_SQL].append((
+                contested_shots,
+                deflections,
+                charges_drawn,
+                loose_balls_recovered,
+                player_game_id
+            ))
+            
+            # Successfully processed, return
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error processing hustle stats for {player_game_id}: {e}")
+            return False
 
-def run_etl():
-    """Run the full ETL process"""
+def run_etl(days_back=3, game_limit=5):
+    """Run the full ETL process
+    
+    The daily run loads player stats for at most game_limit games; a backfill
+    passes a wider days_back and game_limit=None to load every game found.
+    """
     logger.info("Starting NBA data warehouse ETL job")
     
     warehouse = NBADataWarehouse()
@@ -1485,14 +1656,17 @@ def run_etl():
     warehouse.load_players()
     
     # Step 4: Load games and fact tables
-    # First load game data for the last 3 days
-    game_ids = warehouse.load_games(days_back=3)
+    # First load game data for the last days_back days
+    game_ids = warehouse.load_games(days_back=days_back)
     
     # Then load player stats for those games
     if game_ids:
-        warehouse.load_player_game_stats(game_ids, limit=5)
+        warehouse.load_player_game_stats(game_ids, limit=game_limit)
+    
+    # Step 5: Refresh planner statistics now that the bulk load is done
+    warehouse.analyze_db()
     
-    # Step 5: Close database connection
+    # Step 6: Close database connection
     warehouse.close_db()
     
     logger.info("NBA data warehouse ETL job completed")
@@ -1511,7 +1685,9 @@ def schedule_etl():
     try:
         while True:
             schedule.run_pending()
-            time.sleep(60)  # Sleep for 1 minute
+            # Sleep until the next job is due instead of waking every minute
+            idle_seconds = schedule.idle_seconds()
+            time.sleep(max(idle_seconds, 0) if idle_seconds is not None else 60)
     except KeyboardInterrupt:
         logger.info("Scheduler stopped by user")
 
@@ -1521,13 +1697,18 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="NBA Data Warehouse ETL")
     parser.add_argument("--run-now", action="store_true", help="Run the ETL job immediately")
     parser.add_argument("--schedule", action="store_true", help="Run the ETL job on a schedule")
+    parser.add_argument("--backfill", type=int, metavar="DAYS",
+                        help="Run the ETL job once for every game in the last DAYS days")
     args = parser.parse_args()
     
-    if args.run_now:
+    if args.backfill:
+        run_etl(days_back=args.backfill, game_limit=None)
+    elif args.run_now:
         run_etl()
     elif args.schedule:
         schedule_etl()
     else:
-        print("Please specify either --run-now or --schedule")
+        print("Please specify --run-now, --schedule or --backfill DAYS")
         print("Example: python nba_etl.py --run-now")
-        print("Example: python nba_etl.py --schedule")
\ No newline at end of file
+        print("Example: python nba_etl.py --schedule")
+        print("Example: python nba_etl.py --backfill 30")
\ No newline at end of file
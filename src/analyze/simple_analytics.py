@@ -1,6 +1,5 @@
 import sqlite3
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 import sys
@@ -11,12 +10,22 @@ sys.path.insert(0, str(project_root))
 
 from config.settings import DATABASE_PATH
 
+def _pyplot():
+    """Import pyplot on first use, so loading this module doesn't pay for matplotlib"""
+    import matplotlib.pyplot as plt
+    return plt
+
 class NBASimpleAnalytics:
     """Simple NBA analytics"""
     
     def __init__(self):
         """Initialize the analytics"""
-        self.conn = sqlite3.connect(DATABASE_PATH)
+        # Read-only, so reports never take the write lock away from a running ETL.
+        # mode=ro can't create the file, so fail clearly before the ETL has run
+        db_path = Path(DATABASE_PATH)
+        if not db_path.exists():
+            raise FileNotFoundError(f"Database not found at {db_path}; run the ETL first")
+        self.conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
     
     def get_team_stats(self):
         """Get teams from the database"""
@@ -32,16 +41,20 @@ class NBASimpleAnalytics:
     
     def team_analysis(self):
         """Analyze teams by conference and division"""
-        teams = self.get_team_stats()
+        # Count teams by conference in SQLite instead of loading every team row
+        rows = self.conn.execute(
+            "SELECT conference, COUNT(*) FROM dim_teams WHERE conference IS NOT NULL "
+            "GROUP BY conference ORDER BY COUNT(*) DESC"
+        ).fetchall()
         
-        if teams.empty:
-            print("No team data found in the database.")
+        if not rows:
+            print("No team conference data found in the database.")
             return
         
-        # Count teams by conference
-        conference_counts = teams['conference'].value_counts()
+        conference_counts = pd.Series(dict(rows), name='count').rename_axis('conference')
         
         # Create a bar chart
+        plt = _pyplot()
         plt.figure(figsize=(10, 6))
         conference_counts.plot(kind='bar', color=['blue', 'red'])
         plt.title('NBA Teams by Conference')
@@ -57,17 +70,20 @@ class NBASimpleAnalytics:
     
     def player_analysis(self):
         """Analyze players"""
-        players = self.get_player_stats()
+        # Count first letter of last name in SQLite instead of loading every player row
+        rows = self.conn.execute(
+            "SELECT substr(last_name, 1, 1) AS first_letter, COUNT(*) FROM dim_players "
+            "WHERE last_name <> '' GROUP BY first_letter ORDER BY first_letter"
+        ).fetchall()
         
-        if players.empty:
+        if not rows:
             print("No player data found in the database.")
             return
         
-        # Count first letter of last name
-        players['first_letter'] = players['last_name'].str[0]
-        letter_counts = players['first_letter'].value_counts().sort_index()
+        letter_counts = pd.Series(dict(rows), name='count').rename_axis('first_letter')
         
         # Create a bar chart
+        plt = _pyplot()
         plt.figure(figsize=(12, 6))
         letter_counts.plot(kind='bar', color='green')
         plt.title('NBA Players by First Letter of Last Name')
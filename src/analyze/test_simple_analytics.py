@@ -0,0 +1,66 @@
+# src/analyze/test_simple_analytics.py
+# Offline checks for the simple analytics report; run with: python -m unittest src.analyze.test_simple_analytics
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+project_root = Path(__file__).parent.parent.parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from src.analyze import simple_analytics
+from src.analyze.simple_analytics import NBASimpleAnalytics
+
+class SimpleAnalyticsTest(unittest.TestCase):
+    """The report opens the warehouse read-only and counts rows in SQL"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "nba_data.db")
+        patcher = mock.patch.object(simple_analytics, "DATABASE_PATH", self.db_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _create_warehouse(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+        CREATE TABLE dim_teams (team_id TEXT PRIMARY KEY, conference TEXT);
+        CREATE TABLE dim_players (player_id TEXT PRIMARY KEY, last_name TEXT);
+        INSERT INTO dim_teams VALUES ('1', 'East'), ('2', 'East'), ('3', 'West'), ('4', NULL);
+        INSERT INTO dim_players VALUES ('1', 'Adams'), ('2', 'Allen'), ('3', 'Ball'), ('4', '');
+        """)
+        conn.commit()
+        conn.close()
+
+    def test_module_does_not_import_pyplot(self):
+        self.assertNotIn("matplotlib.pyplot", sys.modules)
+
+    def test_missing_warehouse_raises_clear_error(self):
+        with self.assertRaises(FileNotFoundError) as raised:
+            NBASimpleAnalytics()
+        self.assertIn(self.db_path, str(raised.exception))
+        self.assertFalse(os.path.exists(self.db_path))
+
+    def test_connection_is_read_only(self):
+        self._create_warehouse()
+        analytics = NBASimpleAnalytics()
+        self.addCleanup(analytics.close)
+        with self.assertRaises(sqlite3.OperationalError):
+            analytics.conn.execute("DELETE FROM dim_teams")
+
+    def test_counts_come_from_sql(self):
+        self._create_warehouse()
+        analytics = NBASimpleAnalytics()
+        self.addCleanup(analytics.close)
+        with mock.patch.object(simple_analytics, "_pyplot"), mock.patch("pandas.Series.plot"):
+            conference_counts = analytics.team_analysis()
+            letter_counts = analytics.player_analysis()
+        self.assertEqual(conference_counts.to_dict(), {'East': 2, 'West': 1})
+        self.assertEqual(letter_counts.to_dict(), {'A': 2, 'B': 1})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -64,4 +64,6 @@ if __name__ == "__main__":
     # Run the scheduler
     while True:
         schedule.run_pending()
-        time.sleep(60)  # Sleep for 1 minute
\ No newline at end of file
+        # Sleep until the next job is due instead of waking every minute
+        idle_seconds = schedule.idle_seconds()
+        time.sleep(max(idle_seconds, 0) if idle_seconds is not None else 60)
\ No newline at end of file
@@ -0,0 +1,129 @@
+# test_nba_etl.py
+# Offline checks for the warehouse ETL; run with: python -m unittest test_nba_etl
+import importlib
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from collections import defaultdict
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+project_root = Path(__file__).parent.absolute()
+sys.path.insert(0, str(project_root))
+
+nba_etl = None
+_workdir = None
+_cwd = None
+
+def setUpModule():
+    """Import nba_etl from a scratch directory, since it creates data/ and its log file on import"""
+    global nba_etl, _workdir, _cwd
+    _cwd = os.getcwd()
+    _workdir = tempfile.TemporaryDirectory()
+    os.chdir(_workdir.name)
+    nba_etl = importlib.import_module("nba_etl")
+    nba_etl.DATABASE_PATH = os.path.join(_workdir.name, "nba_data.db")
+
+def tearDownModule():
+    os.chdir(_cwd)
+    _workdir.cleanup()
+
+def _box_score(name, headers, rows):
+    return {'resultSets': [{'name': name, 'headers': headers, 'rowSet': rows}]}
+
+class AdvancedStatsTypesTest(unittest.TestCase):
+    """Advanced and tracking stats must bind as SQLite integers and reals, not numpy BLOBs"""
+
+    def setUp(self):
+        self.warehouse = nba_etl.NBADataWarehouse()
+        self.assertTrue(self.warehouse.ensure_tables_exist())
+
+    def tearDown(self):
+        self.warehouse.close_db()
+        os.remove(nba_etl.DATABASE_PATH)
+
+    def test_tracking_and_advanced_columns_keep_their_types(self):
+        adv = _box_score('PlayerStats', ['PLAYER_ID', 'OFF_RATING', 'AST_PCT', 'USG_PCT'], [[2544, 112.5, 0.2, 0.25]])
+        tracking = _box_score(
+            'PlayerTrackingStats',
+            ['PLAYER_ID', 'DIST_MILES', 'POTENTIAL_AST', 'PASSES_MADE'],
+            [[2544, 2.5, 6, 40]]
+        )
+        adv_records = nba_etl.NBADataWarehouse._player_stats_records(adv, 'PlayerStats')
+        tracking_records = nba_etl.NBADataWarehouse._player_stats_records(tracking, 'PlayerTrackingStats')
+
+        stat_rows = defaultdict(list)
+        player_game_id = "0022400001_2544"
+        self.assertTrue(self.warehouse._process_advanced_stats(
+            player_game_id, adv_records.get(2544), tracking_records.get(2544), "2024-10-22 00:00:00", stat_rows
+        ))
+        with self.warehouse._transaction():
+            for stat_sql, rows in stat_rows.items():
+                self.warehouse.cursor.executemany(stat_sql, rows)
+
+        cursor = self.warehouse.cursor
+        cursor.execute(
+            "SELECT typeof(potential_assists), typeof(passes_made), typeof(assist_pct), typeof(usage_pct) "
+            "FROM fact_player_playmaking WHERE player_game_id = ?",
+            (player_game_id,)
+        )
+        self.assertEqual(cursor.fetchone(), ('integer', 'integer', 'real', 'real'))
+
+        cursor.execute(
+            "SELECT typeof(offensive_rating), typeof(true_shooting_pct) FROM fact_player_efficiency "
+            "WHERE player_game_id = ?",
+            (player_game_id,)
+        )
+        # Columns the API omitted are stored as NULL
+        self.assertEqual(cursor.fetchone(), ('real', 'null'))
+
+        cursor.execute(
+            "SELECT typeof(distance_miles), typeof(avg_speed_mph) FROM fact_player_hustle WHERE player_game_id = ?",
+            (player_game_id,)
+        )
+        self.assertEqual(cursor.fetchone(), ('real', 'null'))
+
+class GameStatsRetryTest(unittest.TestCase):
+    """Network errors raised by requests go through the jittered retry, not the give-up path"""
+
+    def test_requests_errors_are_retried(self):
+        outcomes = [requests.exceptions.ConnectionError("reset"), requests.exceptions.ReadTimeout("slow")]
+
+        class FlakyEndpoint:
+            def __init__(self, game_id):
+                if outcomes:
+                    raise outcomes.pop(0)
+
+            def get_dict(self):
+                return {'resultSets': []}
+
+        warehouse = nba_etl.NBADataWarehouse()
+        with mock.patch.object(nba_etl.time, 'sleep') as sleep:
+            self.assertEqual(warehouse._get_game_stats(FlakyEndpoint, "0022400001"), {'resultSets': []})
+        self.assertEqual(sleep.call_count, 2)
+
+class SchemaMismatchTest(unittest.TestCase):
+    """Only missing tables and columns are treated as a schema mismatch"""
+
+    def _error(self, sql):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (a)")
+        with self.assertRaises(sqlite3.OperationalError) as raised:
+            conn.execute(sql)
+        conn.close()
+        return raised.exception
+
+    def test_missing_table_and_columns(self):
+        self.assertTrue(nba_etl._is_schema_mismatch(self._error("INSERT INTO missing VALUES (1)")))
+        self.assertTrue(nba_etl._is_schema_mismatch(self._error("INSERT INTO t (b) VALUES (1)")))
+        self.assertTrue(nba_etl._is_schema_mismatch(self._error("UPDATE t SET b = 1")))
+
+    def test_lock_errors_are_not_a_mismatch(self):
+        self.assertFalse(nba_etl._is_schema_mismatch(sqlite3.OperationalError("database is locked")))
+
+if __name__ == "__main__":
+    unittest.main()